@@ -0,0 +1,96 @@
+# buttons.py Edge-triggered, debounced input for the Galactic Unicorn switches.
+# While every switch is up the task sleeps until a pin interrupt reports a
+# press; only while a switch is held does it scan, every SCAN_MS. Edges are
+# reported straight away and further changes ignored for DEBOUNCE_MS.
+
+import time
+import uasyncio as asyncio
+from machine import Pin
+
+SCAN_MS = 10
+DEBOUNCE_MS = 30
+REPEAT_DELAY_MS = 500  # Hold this long before auto-repeat starts
+REPEAT_MS = 150
+LONG_PRESS_MS = 1000
+IDLE_POLL_MS = 250  # Idle scan interval if pin interrupts are not available
+
+# Events passed to handlers
+PRESS = 0
+RELEASE = 1
+REPEAT = 2  # Repeating switches, while held
+LONG = 3  # Other switches, once, when held for LONG_PRESS_MS
+
+
+class _Switch:
+    def __init__(self, switch, handler, repeat):
+        self.switch = switch
+        self.handler = handler
+        self.repeat = repeat
+        self.down = False
+        self.settling = False  # Within DEBOUNCE_MS of the last edge
+        self.changed = 0  # ticks_ms of the last edge
+        self.due = 0  # ms held before the next REPEAT or LONG event
+
+
+class Buttons:
+    def __init__(self, gu):
+        self._gu = gu
+        self._switches = []
+        self._flag = asyncio.ThreadSafeFlag()
+        self._irq = True
+
+    # handler(event) is called for PRESS and RELEASE, plus REPEAT if repeat is
+    # set, or else LONG.
+    def on(self, switch, handler, repeat=False):
+        self._switches.append(_Switch(switch, handler, repeat))
+        try:
+            Pin(switch, Pin.IN, Pin.PULL_UP).irq(self._wake, Pin.IRQ_FALLING)
+        except (AttributeError, OSError, ValueError):
+            self._irq = False
+
+    def _wake(self, _):
+        self._flag.set()
+
+    # Scan until every switch has been released and settled.
+    async def _scan(self):
+        is_pressed = self._gu.is_pressed
+        busy = True
+        while busy:
+            busy = False
+            now = time.ticks_ms()
+            for s in self._switches:
+                if s.settling:
+                    if time.ticks_diff(now, s.changed) < DEBOUNCE_MS:
+                        busy = True  # Ignore bounces
+                        continue
+                    s.settling = False
+                if is_pressed(s.switch) != s.down:
+                    s.down = not s.down
+                    s.changed = now
+                    s.settling = True
+                    busy = True
+                    if s.down:
+                        s.due = REPEAT_DELAY_MS if s.repeat else LONG_PRESS_MS
+                        s.handler(PRESS)
+                    else:
+                        s.handler(RELEASE)
+                elif s.down:
+                    busy = True
+                    if s.due and time.ticks_diff(now, s.changed) >= s.due:
+                        if s.repeat:
+                            s.due += REPEAT_MS
+                            s.handler(REPEAT)
+                        else:
+                            s.due = 0
+                            s.handler(LONG)
+            if busy:
+                await asyncio.sleep_ms(SCAN_MS)
+
+    # The input task: run once for the life of the application.
+    async def run(self):
+        while True:
+            if self._irq:
+                await self._flag.wait()
+            else:
+                await asyncio.sleep_ms(IDLE_POLL_MS)
+            await self._scan()
@@ -1,15 +1,18 @@
 import json
-import math
-import random
 import re
 import time
+from array import array
 import urandom
 import uasyncio as asyncio
+import network
 from galactic import GalacticUnicorn
 from picographics import PicoGraphics, DISPLAY_GALACTIC_UNICORN as DISPLAY
 from machine import Pin, PWM, Timer, reset
 from mqtt_as import MQTTClient, config
 from mqtt_config import wifi_led, blue_led, TOPIC_PREFIX  # Local definitions
+from sequencer import Sequencer, DEFAULT_MELODY
+from buttons import Buttons, PRESS, REPEAT
+from telemetry import Telemetry
 
 # constants for controlling scrolling text
 DEFAULT_BRIGHTNESS = 0.5
@@ -19,84 +22,139 @@ DEFAULT_BG_COLOUR = (0, 0, 0)
 PADDING = 2
 HOLD_TIME = 0
 STEP_TIME = 0.03  # Edit to slow down/speed up text - lower for faster scrolling
+STEP_MS = int(STEP_TIME * 1000)
 MESSAGE_REPEAT_MIN = 60
+PEN_CACHE_SIZE = 32  # Distinct colours kept as pens before the oldest is evicted
+STRIP_CACHE_MAX_COLS = 2048  # Longest message (in pixels) that is pre-rendered into a strip
+STATUS_INTERVAL = 60  # Seconds between status reports published to TOPIC_PREFIX/status
 
 # create galactic object and graphics surface for drawing
 gu = GalacticUnicorn()
 graphics = PicoGraphics(DISPLAY)
 graphics.set_font("bitmap8")
-current_task = None
 
 WIDTH = GalacticUnicorn.WIDTH
 HEIGHT = GalacticUnicorn.HEIGHT
 ROTATE_180 = True
 
-# notification tone
-TONES = [523.25, 311.13, 392, 466.16]
-volume = 1.0
-
-# define known colours
-KNOWN_COLOURS = {
-    "red": (255, 0, 0),
-    "green": (0, 255, 0),
-    "blue": (0, 0, 255),
-    "yellow": (255, 255, 0),
-    "magenta": (255, 0, 255),
-    "purple": (128, 0, 128),
-    "cyan": (0, 255, 255),
-    "orange": (255, 165, 0),
-    "black": (0, 0, 0),
-    "none": (0, 0, 0),
-    "nil": (0, 0, 0),
-    "null": (0, 0, 0),
-    "white": (255, 255, 255),
-    "gray": (128, 128, 128),
-    "grey": (128, 128, 128),  # Alternate spelling
-    "pink": (255, 192, 203),
-    "brown": (165, 42, 42),
-    "lime": (0, 255, 0),
-    "navy": (0, 0, 128),
-    "teal": (0, 128, 128),
-    "olive": (128, 128, 0),
-    "maroon": (128, 0, 0),
-    "aqua": (0, 255, 255),
-    "silver": (192, 192, 192),
-    "gold": (255, 215, 0),
-    "beige": (245, 245, 220),
-    "violet": (238, 130, 238),
-}
-
-async def play_tone_realistic(channel, base_freq, base_volume, duration):
-    start_time = time.ticks_ms()
-    elapsed = 0
-    fade_out_steps = 10
-    fade_out_delay = 0.005
-
-    while elapsed < duration * 1000 - fade_out_steps * fade_out_delay * 1000:
-        vibrato = 5 * math.sin(2 * math.pi * 5 * elapsed / 1000)
-        freq = base_freq + vibrato
-        tremolo = base_volume * (0.8 + 0.2 * math.sin(2 * math.pi * 3 * elapsed / 1000))
-        channel.play_tone(int(freq), tremolo)
-        gu.play_synth()
-        wait = 0.01 + random.uniform(-0.002, 0.002)
-        await asyncio.sleep(wait)
-
-        elapsed = time.ticks_ms() - start_time
-
-    # Fade-out volume smoothly
-    for i in range(fade_out_steps, 0, -1):
-        vol = base_volume * (i / fade_out_steps) * (0.8 + 0.2 * math.sin(2 * math.pi * 3 * elapsed / 1000))
-        channel.play_tone(int(freq), vol)
-        gu.play_synth()
-        await asyncio.sleep(fade_out_delay)
-    gu.stop_playing()
-    await asyncio.sleep_ms(10)
-
-
-async def play_notification_tone():
-    channel = gu.synth_channel(0)
-    for t in TONES:
-        await play_tone_realistic(channel, t, volume, 0.2)
+# PicoGraphics exposes its RGB888 framebuffer (4 bytes per pixel) through the
+# buffer protocol. It is only read back when pre-rendering message strips and
+# measuring TEXT_MIRROR.
+try:
+    FRAMEBUFFER = memoryview(graphics)
+    if len(FRAMEBUFFER) != WIDTH * HEIGHT * 4:
+        FRAMEBUFFER = None
+except TypeError:
+    FRAMEBUFFER = None  # No framebuffer access: messages are drawn from scratch every frame
+
+# notification sounds, played by one long-running task
+sequencer = Sequencer(gu)
+buttons = Buttons(gu)
+telemetry = Telemetry()
+
+# Named colours: every CSS colour name, plus none/nil/null as black. green keeps
+# its original pure green value rather than CSS's (0, 128, 0). The table is
+# unpacked at import into one sorted, space separated string of names and an
+# array of packed 24-bit values, found by binary search: about 2 KB of heap
+# instead of a dict of tuples.
+_COLOUR_TABLE = (
+    "aliceblue f0f8ff antiquewhite faebd7 aqua 00ffff aquamarine 7fffd4 "
+    "azure f0ffff beige f5f5dc bisque ffe4c4 black 000000 "
+    "blanchedalmond ffebcd blue 0000ff blueviolet 8a2be2 brown a52a2a "
+    "burlywood deb887 cadetblue 5f9ea0 chartreuse 7fff00 chocolate d2691e "
+    "coral ff7f50 cornflowerblue 6495ed cornsilk fff8dc crimson dc143c "
+    "cyan 00ffff darkblue 00008b darkcyan 008b8b darkgoldenrod b8860b "
+    "darkgray a9a9a9 darkgreen 006400 darkgrey a9a9a9 darkkhaki bdb76b "
+    "darkmagenta 8b008b darkolivegreen 556b2f darkorange ff8c00 "
+    "darkorchid 9932cc darkred 8b0000 darksalmon e9967a darkseagreen 8fbc8f "
+    "darkslateblue 483d8b darkslategray 2f4f4f darkslategrey 2f4f4f "
+    "darkturquoise 00ced1 darkviolet 9400d3 deeppink ff1493 "
+    "deepskyblue 00bfff dimgray 696969 dimgrey 696969 dodgerblue 1e90ff "
+    "firebrick b22222 floralwhite fffaf0 forestgreen 228b22 fuchsia ff00ff "
+    "gainsboro dcdcdc ghostwhite f8f8ff gold ffd700 goldenrod daa520 "
+    "gray 808080 green 00ff00 greenyellow adff2f grey 808080 honeydew f0fff0 "
+    "hotpink ff69b4 indianred cd5c5c indigo 4b0082 ivory fffff0 khaki f0e68c "
+    "lavender e6e6fa lavenderblush fff0f5 lawngreen 7cfc00 "
+    "lemonchiffon fffacd lightblue add8e6 lightcoral f08080 lightcyan e0ffff "
+    "lightgoldenrodyellow fafad2 lightgray d3d3d3 lightgreen 90ee90 "
+    "lightgrey d3d3d3 lightpink ffb6c1 lightsalmon ffa07a "
+    "lightseagreen 20b2aa lightskyblue 87cefa lightslategray 778899 "
+    "lightslategrey 778899 lightsteelblue b0c4de lightyellow ffffe0 "
+    "lime 00ff00 limegreen 32cd32 linen faf0e6 magenta ff00ff maroon 800000 "
+    "mediumaquamarine 66cdaa mediumblue 0000cd mediumorchid ba55d3 "
+    "mediumpurple 9370db mediumseagreen 3cb371 mediumslateblue 7b68ee "
+    "mediumspringgreen 00fa9a mediumturquoise 48d1cc mediumvioletred c71585 "
+    "midnightblue 191970 mintcream f5fffa mistyrose ffe4e1 moccasin ffe4b5 "
+    "navajowhite ffdead navy 000080 nil 000000 none 000000 null 000000 "
+    "oldlace fdf5e6 olive 808000 olivedrab 6b8e23 orange ffa500 "
+    "orangered ff4500 orchid da70d6 palegoldenrod eee8aa palegreen 98fb98 "
+    "paleturquoise afeeee palevioletred db7093 papayawhip ffefd5 "
+    "peachpuff ffdab9 peru cd853f pink ffc0cb plum dda0dd powderblue b0e0e6 "
+    "purple 800080 rebeccapurple 663399 red ff0000 rosybrown bc8f8f "
+    "royalblue 4169e1 saddlebrown 8b4513 salmon fa8072 sandybrown f4a460 "
+    "seagreen 2e8b57 seashell fff5ee sienna a0522d silver c0c0c0 "
+    "skyblue 87ceeb slateblue 6a5acd slategray 708090 slategrey 708090 "
+    "snow fffafa springgreen 00ff7f steelblue 4682b4 tan d2b48c teal 008080 "
+    "thistle d8bfd8 tomato ff6347 turquoise 40e0d0 violet ee82ee "
+    "wheat f5deb3 white ffffff whitesmoke f5f5f5 yellow ffff00 "
+    "yellowgreen 9acd32 "
+)
+
+
+def _unpack_colour_table(table):
+    fields = table.split()
+    names = []
+    values = array("I")
+    offsets = array("H", [0])
+    pos = 0
+    for i in range(0, len(fields), 2):
+        names.append(fields[i])
+        values.append(int(fields[i + 1], 16))
+        pos += len(fields[i]) + 1
+        offsets.append(pos)
+    return " ".join(names) + " ", offsets, values
+
+
+COLOUR_NAMES, COLOUR_OFFSETS, COLOUR_VALUES = _unpack_colour_table(_COLOUR_TABLE)
+del _COLOUR_TABLE
+
+
+def unpack_rgb(packed):
+    return (packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF)
+
+
+def pack_rgb(colour):
+    return colour[0] << 16 | colour[1] << 8 | colour[2]
+
+
+def lookup_colour(name):
+    lo, hi = 0, len(COLOUR_VALUES)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        probe = COLOUR_NAMES[COLOUR_OFFSETS[mid]:COLOUR_OFFSETS[mid + 1] - 1]
+        if probe < name:
+            lo = mid + 1
+        elif probe > name:
+            hi = mid
+        else:
+            return unpack_rgb(COLOUR_VALUES[mid])
+    return None
+
+
+# Colours "random", "any" etc. pick from: the original palette, repeats included
+RANDOM_COLOURS = array("I", [pack_rgb(lookup_colour(name)) for name in (
+    "red green blue yellow magenta purple cyan orange black none nil null white gray "
+    "grey pink brown lime navy teal olive maroon aqua silver gold beige violet").split()])
+
+
+def hsv_to_rgb(h, s, v):  # h in turns, s and v from 0 to 1
+    i = int(h * 6)
+    f = h * 6 - i
+    v = int(v * 255 + 0.5)
+    p = int(v * (1 - s) + 0.5)
+    q = int(v * (1 - s * f) + 0.5)
+    t = int(v * (1 - s * (1 - f)) + 0.5)
+    return ((v, t, p), (q, v, p), (p, v, t), (p, q, v), (t, p, v), (v, p, q))[i % 6]
 
 
 def simple_split(input_string):
@@ -115,327 +173,760 @@ def simple_split(input_string):
     return words
 
 
-def pick_colour(input_string):
-    words = simple_split(input_string)
-    # Set comprehension for words not in KNOWN_COLOURS
-    cmd_in_words = {word for word in words if word not in KNOWN_COLOURS}
+# Words that turn a colour spec into a random pick, and ones that make the named
+# colours exclusions rather than choices
+PICK_WORDS = {"random", "select", "pick", "choose", "any"}
+EXCLUDE_WORDS = {"not", "no", "ignore", "exclude", "minus", "except", "remove", "nor"}
+COLOUR_SPEC_CACHE_SIZE = 16  # Resolved colour specs kept, least recently used evicted
+_BRACES = re.compile(r"[\[\]\(\)\{\}\s]")
+
 
-    # List comprehension for colours that exist in KNOWN_COLOURS. Repeats increases chance of colour.
-    given_colours = [word for word in words if word in KNOWN_COLOURS]
+# Colours a list of words may resolve to, or None. Repeats increase the chance
+# of a colour being picked.
+def colour_candidates(words):
+    cmd_in_words = set()
+    given_colours = []
+    for word in words:
+        colour = lookup_colour(word)
+        if colour is None:
+            cmd_in_words.add(word)
+        else:
+            given_colours.append(colour)
 
-    # if no colours are provided, we will use them all as potential values
+    # if no colours are provided, pick from the whole random palette
     if not given_colours:
         # no colours we know about. Make sure that there is at least a "random" or "pick" mentioned
-        if not cmd_in_words.intersection({"random", "select", "pick", "choose", "any"}):
-            return
-        keys = tuple(KNOWN_COLOURS.keys())  # Convert keys to a tuple once
-    elif cmd_in_words.intersection(
-        {"not", "no", "ignore", "exclude", "minus", "except", "remove", "nor"}
-    ):
-        ## Assuming there are unique values for every colour, this should do it
-        ## keys = tuple([word for word in KNOWN_COLOURS if word not in set(given_colours)])
-        ## But since there are repeated values for colours (like gray and grey), we need to look at values
+        if not cmd_in_words.intersection(PICK_WORDS):
+            return None
+        return tuple([unpack_rgb(packed) for packed in RANDOM_COLOURS])
+    if cmd_in_words.intersection(EXCLUDE_WORDS):
+        ## Since there are repeated values for colours (like gray and grey), we need to look at values
         ## to know for cetain what to exclude.
-        unwanted_values = {KNOWN_COLOURS[given_colour] for given_colour in given_colours}
-        keys = tuple(
-            [word for word in KNOWN_COLOURS if KNOWN_COLOURS[word] not in unwanted_values]
-        )
-    else:
-        keys = tuple(given_colours)
+        unwanted_values = {pack_rgb(colour) for colour in given_colours}
+        return tuple(
+            [unpack_rgb(packed) for packed in RANDOM_COLOURS if packed not in unwanted_values]
+        ) or None
+    return tuple(given_colours)
 
-    random_key = keys[urandom.getrandbits(8) % len(keys)]  # Randomly select a key
-    return KNOWN_COLOURS[random_key]
-
-
-def parse_rgb(colour_str, retry=0):
-    if retry > 1:
-        return None
-    if colour_str is None:
-        return None
 
-    try:
-        # Remove any square, curly, round braces, and whitespace from the string
-        colour_str = re.sub(r"[\[\]\(\)\{\}\s]", "", colour_str)
+def pick_colour(input_string):
+    candidates = colour_candidates(simple_split(input_string))
+    if candidates:
+        return candidates[urandom.getrandbits(8) % len(candidates)]  # Randomly select a colour
 
-        # Split the string by commas
-        parts = colour_str.split(",")
 
-        # special cases
-        if len(parts) > 0 and retry == 1:
-            # 0
-            if parts[0] == "0" or not parts[0]:
-                parts = ["0", "0", "0"]
-            else:
-                return pick_colour(colour_str.lower())
+# "50%" or "0.5" -> 0.5; plain numbers above 1 are taken as percentages
+def _fraction(part):
+    if part.endswith("%"):
+        value = float(part[:-1]) / 100
+    else:
+        value = float(part)
+        if value > 1:
+            value /= 100
+    return min(max(value, 0.0), 1.0)
+
+
+# Work out every colour a spec such as "0x10, 0x20, 0x30", "#ff8000", "#f80",
+# "hsv(30, 100%, 100%)" (hue in degrees), "red" or "any_except_black_or_brown"
+# can stand for. Returns a tuple of RGB tuples (just one for a fixed colour),
+# or None if the spec is not a colour.
+def _colour_spec_candidates(colour_str):
+    spec = colour_str.strip().lower()
+    if spec.startswith("#"):
+        digits = spec[1:]
+        if len(digits) == 3:
+            digits = digits[0] * 2 + digits[1] * 2 + digits[2] * 2
+        if len(digits) != 6 or [d for d in digits if d not in "0123456789abcdef"]:
+            return None
+        return (unpack_rgb(int(digits, 16)),)
+    if spec.startswith("hsv"):
+        parts = _BRACES.sub("", spec[3:]).split(",")
+        try:
+            h, s, v = parts
+            return (hsv_to_rgb(float(h) % 360 / 360, _fraction(s), _fraction(v)),)
+        except ValueError:
+            return None
+
+    # Remove any square, curly, round braces, and whitespace from the string
+    colour_str = _BRACES.sub("", colour_str)
+
+    # Split the string by commas
+    parts = colour_str.split(",")
 
+    try:
         # Convert each part to an integer, interpreting as hex if it starts with '0x'
         r, g, b = [
             (
-                int(part.strip(), 16)
-                if part.strip().lower().startswith("0x")
-                else int(part.strip())
+                int(part, 16)
+                if part.lower().startswith("0x")
+                else int(part)
             )
             for part in parts
         ]
 
         # Ensure the values are within the valid range
         if 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255:
-            return (r, g, b)
-
-    except TypeError:
-        pass  # Implicit return None
+            return ((r, g, b),)
     except ValueError:
-        pass  # Implicit return None
+        pass
 
-    # Recurse call to try parsing value as a string
-    return parse_rgb(str(colour_str), retry + 1)
+    # special cases: 0 or nothing is black, otherwise try it as words
+    if parts[0] == "0" or not parts[0]:
+        return ((0, 0, 0),)
+    return colour_candidates(simple_split(spec))
 
 
-def parse_msg(msg):
-    try:
-        # Attempt to parse the message as JSON
-        data = json.loads(msg)
+# spec -> [candidates, last use]. Only the random draw is left per message.
+_colour_specs = {}
+_colour_spec_uses = 0
+
+
+def resolve_colour_spec(colour_str):
+    global _colour_spec_uses
+    _colour_spec_uses += 1
+    entry = _colour_specs.get(colour_str)
+    if entry is None:
+        if len(_colour_specs) >= COLOUR_SPEC_CACHE_SIZE:
+            oldest = min(_colour_specs, key=lambda spec: _colour_specs[spec][1])
+            del _colour_specs[oldest]
+        entry = _colour_specs[colour_str] = [_colour_spec_candidates(colour_str), 0]
+    entry[1] = _colour_spec_uses
+    return entry[0]
+
+
+def parse_rgb(colour_str):
+    if colour_str is None:
+        return None
+    if not isinstance(colour_str, str):
+        colour_str = str(colour_str)
 
-        # Extract text and colour strings
-        text = data.get("msg", data.get("message", data.get("text", data.get("txt", ""))))
-        progress = data.get("progress", data.get("percent", data.get("value", 0)))
+    candidates = resolve_colour_spec(colour_str)
+    if not candidates:
+        return None
+    if len(candidates) == 1:
+        return candidates[0]
+    return candidates[urandom.getrandbits(8) % len(candidates)]  # Randomly select a colour
 
-        text_colour_value = data.get("msg_colour", data.get("text_colour", data.get("txt_colour", data.get(
-                "msg_color", data.get("text_color", data.get("txt_color"))))))
-        bg_colour_value = data.get("bg_colour", data.get("bg_color"))
-        outline_colour_value = data.get("outline_colour", data.get("outline_color"))
 
-        # Parse colours if present, or fall back to defaults
-        bg_colour = parse_rgb(bg_colour_value) or DEFAULT_BG_COLOUR
-        outline_colour = parse_rgb(outline_colour_value) or DEFAULT_OUTLINE_COLOUR
-        text_colour = parse_rgb(text_colour_value) or DEFAULT_MESSAGE_COLOUR
+# A progress value as a float; None (so the default) for NaN and infinities,
+# which float() accepts as "nan", "inf" or an overflowing number.
+def parse_progress(value):
+    value = float(value)
+    if value - value != 0:  # NaN for NaN and +/-inf
+        return None
+    return value
+
+
+# Payload fields: canonical name, accepted keys in order of precedence, converter
+# and default. Compiled once into a key -> field index so that parse_msg makes a
+# single pass over the decoded object and only converts the winning value.
+# A converter returning None, or raising, falls back to the default.
+PAYLOAD_FIELDS = (
+    ("text", ("msg", "message", "text", "txt"), str, ""),
+    ("bg_colour", ("bg_colour", "bg_color"), parse_rgb, DEFAULT_BG_COLOUR),
+    ("outline_colour", ("outline_colour", "outline_color"), parse_rgb, DEFAULT_OUTLINE_COLOUR),
+    ("text_colour", ("msg_colour", "text_colour", "txt_colour", "msg_color", "text_color", "txt_color"),
+        parse_rgb, DEFAULT_MESSAGE_COLOUR),
+    ("progress", ("progress", "percent", "value"), parse_progress, 0),
+    ("melody", ("melody", "sound", "tone"), str, DEFAULT_MELODY),
+)
+
+
+def compile_fields(fields):
+    index = {}
+    for slot, (_, keys, convert, _) in enumerate(fields):
+        for rank, key in enumerate(keys):
+            index[key] = (slot, rank, convert)
+    return index
+
+
+FIELD_INDEX = compile_fields(PAYLOAD_FIELDS)
+FIELD_DEFAULTS = tuple(field[3] for field in PAYLOAD_FIELDS)
+
+
+def parse_fields(data):
+    values = list(FIELD_DEFAULTS)
+    ranks = [255] * len(PAYLOAD_FIELDS)  # 255: key not seen
+    for key in data:
+        field = FIELD_INDEX.get(key)
+        if field is not None:
+            slot, rank, _ = field
+            if rank < ranks[slot]:
+                ranks[slot] = rank
+                values[slot] = data[key]
+
+    for slot, rank in enumerate(ranks):
+        if rank == 255:
+            continue
+        value = values[slot]
+        values[slot] = FIELD_DEFAULTS[slot]
+        if value is None:  # JSON null is the same as leaving the key out
+            continue
+        try:
+            value = PAYLOAD_FIELDS[slot][2](value)
+        except (TypeError, ValueError):
+            continue
+        if value is not None:
+            values[slot] = value
+    return values
 
-        return text, bg_colour, outline_colour, text_colour, progress
 
+def parse_msg(msg):
+    try:
+        # Attempt to parse the message as JSON
+        data = json.loads(msg)
     except ValueError:
-        # If the message is not valid JSON, return the defaults
-        return msg, DEFAULT_BG_COLOUR, DEFAULT_OUTLINE_COLOUR, DEFAULT_MESSAGE_COLOUR, 0
+        data = None
+    if not isinstance(data, dict):
+        # If the message is not a JSON object, show it as it is with the defaults
+        return msg, DEFAULT_BG_COLOUR, DEFAULT_OUTLINE_COLOUR, DEFAULT_MESSAGE_COLOUR, 0, DEFAULT_MELODY
+
+    # text, bg_colour, outline_colour, text_colour, progress, melody
+    return tuple(parse_fields(data))
+
+
+# Pens keyed by colour so each colour is converted once per message, not every
+# frame. When full, the oldest entry is evicted to make room.
+class PenCache:
+    def __init__(self, size):
+        self._pens = {}
+        self._keys = [None] * size  # Ring of keys in insertion order
+        self._next = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, key, pen):
+        old = self._keys[self._next]
+        if old is not None:
+            del self._pens[old]
+        self._keys[self._next] = key
+        self._next = (self._next + 1) % len(self._keys)
+        self._pens[key] = pen
+        return pen
+
+    def rgb(self, colour):
+        pen = self._pens.get(colour)
+        if pen is None:
+            self.misses += 1
+            return self._store(colour, graphics.create_pen(
+                    int(colour[0]), int(colour[1]), int(colour[2])))
+        self.hits += 1
+        return pen
+
+    def hsv(self, h, s, v):
+        key = ("hsv", h, s, v)
+        pen = self._pens.get(key)
+        if pen is None:
+            self.misses += 1
+            return self._store(key, graphics.create_pen_hsv(h, s, v))
+        self.hits += 1
+        return pen
+
+
+pens = PenCache(PEN_CACHE_SIZE)
+
+
+# Columns of the framebuffer holding any ink, drawn in white on black.
+def lit_columns():
+    return [x for x in range(WIDTH) if any(FRAMEBUFFER[(y * WIDTH + x) * 4 + 1] for y in range(HEIGHT))]
+
+
+# graphics.text at 180 degrees, given the mirrored origin WIDTH - x as
+# outline_msg is, puts unrotated column n on display column TEXT_MIRROR - n.
+# Measured once on the framebuffer rather than assumed, so that the strip and
+# viewport paths line up with outline_msg whatever graphics.text does; WIDTH
+# (what the host stand-in does) if the framebuffer cannot be read.
+def measure_text_mirror():
+    if FRAMEBUFFER is None:
+        return WIDTH
+    a, b = 20, 30
+    graphics.set_pen(pens.rgb((0, 0, 0)))
+    graphics.clear()
+    graphics.set_pen(pens.rgb((255, 255, 255)))
+    graphics.text("I", a, 2, -1, 1, 0)
+    right = lit_columns()
+    graphics.set_pen(pens.rgb((0, 0, 0)))
+    graphics.clear()
+    graphics.set_pen(pens.rgb((255, 255, 255)))
+    graphics.text("I", b, 8, -1, 1, 180)
+    left = lit_columns()
+    graphics.set_pen(pens.rgb((0, 0, 0)))
+    graphics.clear()
+    if not (right and left):
+        return WIDTH
+    # the rightmost glyph column, right[-1] - a, lands on b - (right[-1] - a) + k
+    return WIDTH + left[0] - b + right[-1] - a
+
+
+TEXT_MIRROR = measure_text_mirror()
 
 
 def clear_screen():
-    graphics.set_pen(graphics.create_pen(0, 0, 0))
+    graphics.set_pen(pens.rgb((0, 0, 0)))
     graphics.clear()
     gu.update(graphics)
 
 
-def outline_msg(text, outline_colour, msg_colour, x, y):
-    if not ROTATE_180:
-        rotate = 0
-    else:
-        rotate = 180
-
-    # draw outline
-    graphics.set_pen(graphics.create_pen(
-            int(outline_colour[0]), int(outline_colour[1]), int(outline_colour[2])))
-    graphics.text(text, x - 1, y - 1, -1, 1, rotate)
-    graphics.text(text, x    , y - 1, -1, 1, rotate)
-    graphics.text(text, x + 1, y - 1, -1, 1, rotate)
-    graphics.text(text, x - 1, y    , -1, 1, rotate)
-    graphics.text(text, x + 1, y    , -1, 1, rotate)
-    graphics.text(text, x - 1, y + 1, -1, 1, rotate)
-    graphics.text(text, x    , y + 1, -1, 1, rotate)
-    graphics.text(text, x + 1, y + 1, -1, 1, rotate)
+def outline_msg(text, outline_pen, msg_pen, x, y, rotate=None):
+    if rotate is None:
+        rotate = 180 if ROTATE_180 else 0
+
+    # draw outline (outline_pen of None draws the bare text)
+    if outline_pen is not None:
+        graphics.set_pen(outline_pen)
+        graphics.text(text, x - 1, y - 1, -1, 1, rotate)
+        graphics.text(text, x    , y - 1, -1, 1, rotate)
+        graphics.text(text, x + 1, y - 1, -1, 1, rotate)
+        graphics.text(text, x - 1, y    , -1, 1, rotate)
+        graphics.text(text, x + 1, y    , -1, 1, rotate)
+        graphics.text(text, x - 1, y + 1, -1, 1, rotate)
+        graphics.text(text, x    , y + 1, -1, 1, rotate)
+        graphics.text(text, x + 1, y + 1, -1, 1, rotate)
 
     # draw text
-    graphics.set_pen(graphics.create_pen(
-            int(msg_colour[0]), int(msg_colour[1]), int(msg_colour[2])))
+    graphics.set_pen(msg_pen)
     graphics.text(text, x, y, -1, 1, rotate)
 
 
-# MQTT Message Display
-async def handle_scroll_message(topic, msg, retained):
-    STATE_PRE_SCROLL = 0
-    STATE_SCROLLING = 1
-    STATE_POST_SCROLL = 2
-    shift = 0
-    state = STATE_PRE_SCROLL
-    last_time = time.ticks_ms()
-    start_time = time.ticks_ms()
-
-    text, bg_colour, outline_colour, msg_colour, _ = parse_msg(msg.decode('utf-8'))
-    if not text:
-        print("clearing screen")
-        clear_screen()
-        return
-    message = str("                " + text + "             ")
-    msg_width = graphics.measure_text(message, 1)
+# Cumulative glyph advances of a message, worked out once, so drawing at any
+# scroll position only touches the characters that fall inside the display.
+_glyph_advances = {}
+
+
+class TextViewport:
+    def __init__(self, text):
+        self.text = text
+        self.offsets = array("I", [0] * (len(text) + 1))
+        x = 0
+        for i, char in enumerate(text):
+            advance = _glyph_advances.get(char)
+            if advance is None:
+                advance = _glyph_advances[char] = graphics.measure_text(char, 1)
+            x += advance
+            self.offsets[i + 1] = x
+        self.width = x
+
+    # Index of the first character whose start offset is greater than x.
+    def _index(self, x):
+        offsets = self.offsets
+        lo, hi = 0, len(offsets)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if offsets[mid] > x:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    # Draw the characters visible with the text origin at unrotated (x, y).
+    # The one pixel outline margin is included in the visibility test.
+    def draw(self, x, y, outline_pen, msg_pen, rotate=None):
+        if rotate is None:
+            rotate = 180 if ROTATE_180 else 0
+        # unrotated columns first_col to first_col + WIDTH - 1 are on the display
+        first_col = TEXT_MIRROR - WIDTH + 1 if rotate else 0
+        first = max(self._index(first_col - x - 1) - 1, 0)
+        last = min(self._index(first_col + WIDTH - x), len(self.text))
+        if first >= last:
+            return
+        x += self.offsets[first]
+        if rotate:
+            x, y = WIDTH - x, HEIGHT - 1 - y
+        outline_msg(self.text[first:last], outline_pen, msg_pen, x, y, rotate)
+
+
+# A message rendered once, outline included, into per-column bitmaps: bit n of
+# a column is row n of the display. Text and outline are separate layers so each
+# frame only has to paint the WIDTH visible columns, however long the message.
+# The glyphs are rasterised once and the outline is their 8-neighbour dilation
+# minus the glyphs themselves, which is what the eight offset draws produce.
+class MessageStrip:
+    def __init__(self, viewport, y):
+        # one extra column either side for the outline
+        self.cols = viewport.width + 2
+        self.text_bits = array("H", [0] * self.cols)
+        self.outline_bits = array("H", [0] * self.cols)
+        self._render(viewport, y)
+
+    def _render(self, viewport, y):
+        fb = FRAMEBUFFER
+        text_bits = self.text_bits
+        # white text on black: any non-zero byte of a pixel is ink
+        for left in range(0, self.cols, WIDTH):
+            graphics.set_pen(pens.rgb((0, 0, 0)))
+            graphics.clear()
+            viewport.draw(1 - left, y, None, pens.rgb((255, 255, 255)), 0)
+            for x in range(min(WIDTH, self.cols - left)):
+                bits = 0
+                offs = x * 4
+                for row in range(HEIGHT):
+                    if fb[offs + 1]:
+                        bits |= 1 << row
+                    offs += WIDTH * 4
+                text_bits[left + x] = bits
+
+        rows = (1 << HEIGHT) - 1
+        prev = 0
+        for c in range(self.cols):
+            bits = text_bits[c]
+            spread = prev | bits | (text_bits[c + 1] if c + 1 < self.cols else 0)
+            spread |= (spread << 1) | (spread >> 1)
+            self.outline_bits[c] = spread & ~bits & rows
+            prev = bits
+
+    # Paint the visible window with the text origin at display column x
+    # (unrotated coordinates, as for outline_msg).
+    def draw(self, x, outline_pen, msg_pen):
+        # unrotated columns first_col to first_col + WIDTH - 1 are on the display
+        first_col = TEXT_MIRROR - WIDTH + 1 if ROTATE_180 else 0
+        start = max(0, first_col + 1 - x)
+        end = min(self.cols, first_col + WIDTH + 1 - x)
+        pixel = graphics.pixel
+        set_pen = graphics.set_pen
+        text_bits = self.text_bits
+        outline_bits = self.outline_bits
+        pen = None
+        # both layers in one pass, only switching pen when the layer changes
+        for c in range(start, end):
+            text = text_bits[c]
+            bits = text | outline_bits[c]
+            col = x - 1 + c
+            if ROTATE_180:
+                col = TEXT_MIRROR - col
+            row = 0
+            while bits:
+                if bits & 1:
+                    want = msg_pen if text & 1 else outline_pen
+                    if want != pen:
+                        pen = want
+                        set_pen(pen)
+                    pixel(col, HEIGHT - 1 - row if ROTATE_180 else row)
+                bits >>= 1
+                text >>= 1
+                row += 1
+
+
+# Fixed-timestep frame scheduler. wait() sleeps until the next step deadline and
+# returns how many steps have come due, so scrolling keeps its pace under load
+# while nothing is redrawn between steps.
+class FrameClock:
+    MAX_CATCH_UP = 10  # Further behind than this and the schedule restarts from now
+
+    def __init__(self, step_ms):
+        self.step_ms = step_ms
+        self.deadline = time.ticks_add(time.ticks_ms(), step_ms)
+        self.dropped = 0  # Steps that came due without a frame of their own
+
+    # Start a fresh schedule, e.g. after idling
+    def restart(self):
+        self.deadline = time.ticks_add(time.ticks_ms(), self.step_ms)
+
+    async def wait(self):
+        delay = time.ticks_diff(self.deadline, time.ticks_ms())
+        # always yield (important or the USB serial device will fail)
+        await asyncio.sleep_ms(max(delay, 0))
+        now = time.ticks_ms()
+        steps = 1 + time.ticks_diff(now, self.deadline) // self.step_ms
+        if steps > self.MAX_CATCH_UP:
+            self.dropped += steps - 1
+            steps = 1
+            self.deadline = time.ticks_add(now, self.step_ms)
+        else:
+            self.dropped += steps - 1
+            self.deadline = time.ticks_add(self.deadline, steps * self.step_ms)
+        return steps
 
-    # play notification sound
-    asyncio.create_task(play_notification_tone())
 
-    # scrolling loop
-    while True:
-        # stop scrolling after 30 min continous
-        elapsed_ms = time.ticks_diff(time.ticks_ms(), start_time)
-        if elapsed_ms >= MESSAGE_REPEAT_MIN * 60 * 1000:
-            clear_screen()
-            return
+def draw_scroll_frame(strip, viewport, shift, bg_pen, outline_pen, msg_pen):
+    # draw bg
+    graphics.set_pen(bg_pen)
+    graphics.clear()
 
-        time_ms = time.ticks_ms()
-        if state == STATE_PRE_SCROLL and time_ms - last_time > HOLD_TIME * 1000:
-            if msg_width + PADDING * 2 >= WIDTH:
-                state = STATE_SCROLLING
-            last_time = time_ms
-        if state == STATE_SCROLLING and time_ms - last_time > STEP_TIME * 1000:
-            shift += 1
-            if shift >= (msg_width + PADDING * 2) - WIDTH - 1:
-                state = STATE_PRE_SCROLL
-                shift = 0
-                last_time = time_ms
-            last_time = time_ms
-        if state == STATE_POST_SCROLL and time_ms - last_time > HOLD_TIME * 1000:
-            state = STATE_PRE_SCROLL
-            shift = 0
-            last_time = time_ms
+    # draw text
+    if strip:
+        strip.draw(PADDING - shift, outline_pen, msg_pen)
+    else:
+        viewport.draw(PADDING - shift, 2, outline_pen, msg_pen)
+    gu.update(graphics)
 
-        # draw bg
-        graphics.set_pen(graphics.create_pen(
-                int(bg_colour[0]), int(bg_colour[1]), int(bg_colour[2])))
-        graphics.clear()
 
-        # draw text
-        if not ROTATE_180:
-            outline_msg(message, outline_colour, msg_colour, PADDING - shift, 2)
-        else:
-            outline_msg(message, outline_colour, msg_colour, WIDTH - PADDING + shift, 8)
-        gu.update(graphics)
+# Scenes are what the renderer shows. draw() paints the whole frame; animated
+# scenes also have advance(steps), which returns True when the frame changed.
+# expires is a ticks_ms deadline after which the display is cleared, or None.
+
+# MQTT Message Display
+class ScrollScene:
+    def __init__(self, text, bg_colour, outline_colour, msg_colour):
+        self.viewport = viewport = TextViewport("                " + text + "             ")
+        msg_width = viewport.width
+
+        # pre-render the whole message once; very long ones only draw what is on screen
+        self.strip = None
+        if FRAMEBUFFER is not None and msg_width + 2 <= STRIP_CACHE_MAX_COLS:
+            self.strip = MessageStrip(viewport, 2)
+        self.bg_pen = pens.rgb(bg_colour)
+        self.outline_pen = pens.rgb(outline_colour)
+        self.msg_pen = pens.rgb(msg_colour)
+
+        # a message that fits on the display never changes until it expires
+        self.animated = msg_width + PADDING * 2 >= WIDTH
+        self.hold_steps = int(HOLD_TIME * 1000) // STEP_MS
+        self.scroll_end = (msg_width + PADDING * 2) - WIDTH - 1
+        self.shift = 0
+        self.hold = self.hold_steps
+        self.expires = time.ticks_add(time.ticks_ms(), MESSAGE_REPEAT_MIN * 60 * 1000)
+
+    def advance(self, steps):
+        last_shift = self.shift
+        for _ in range(steps):
+            if self.hold:
+                self.hold -= 1
+            else:
+                self.shift += 1
+                if self.shift >= self.scroll_end:
+                    self.shift = 0
+                    self.hold = self.hold_steps
+        return self.shift != last_shift
 
-        # pause for a moment (important or the USB serial device will fail)
-        await asyncio.sleep_ms(1)
+    def draw(self):
+        draw_scroll_frame(self.strip, self.viewport, self.shift, self.bg_pen, self.outline_pen, self.msg_pen)
 
 
 # MQTT Progress Bar Message Display
-async def handle_progress_message(topic, msg, retained):
+class ProgressScene:
     HUE_START = 0
     HUE_END = 100
+    animated = False
+    expires = None
+
+    def __init__(self, text, bg_colour, outline_colour, msg_colour, progress):
+        self.text = text
+        self.progress = progress
+
+        # calculate colour from the brightness value
+        hue = max(0, self.HUE_START + ((progress - 0) * (self.HUE_END - self.HUE_START) / (100 - 0)))
+        self.bar_pen = pens.hsv(hue / 360, 1.0, 1.0)
+        self.bg_pen = pens.rgb(bg_colour)
+        self.outline_pen = pens.rgb(outline_colour)
+        self.msg_pen = pens.rgb(msg_colour)
 
     # draws percentage icon
+    @staticmethod
     def draw_percentage(x, y):
         graphics.rectangle(x + 1, y + 1, 2, 2)
         graphics.line(x + 1, y + 5, x + 6, y)
         graphics.rectangle(x + 4, y + 4, 2, 2)
 
-    text, bg_colour, outline_colour, msg_colour, progress = parse_msg(msg.decode('utf-8'))
-    if not text:
-        print("clearing screen")
-        clear_screen()
-        return
+    def draw(self):
+        text = self.text
+        progress = self.progress
+        outline_pen = self.outline_pen
+        msg_pen = self.msg_pen
 
-    # calculate colour from the brightness value
-    hue = max(0, HUE_START + ((progress - 0) * (HUE_END - HUE_START) / (100 - 0)))
-    bar_colour = graphics.create_pen_hsv(hue / 360, 1.0, 1.0)
+        # draw bg
+        graphics.set_pen(self.bg_pen)
+        graphics.clear()
 
-    # draw bg
-    graphics.set_pen(graphics.create_pen(
-            int(bg_colour[0]), int(bg_colour[1]), int(bg_colour[2])))
-    graphics.clear()
+        # draw the text
+        if not ROTATE_180:
+            outline_msg(text, outline_pen, msg_pen, 0, 1)
+        else:
+            outline_msg(text, outline_pen, msg_pen, WIDTH - 1, 9)
 
-    # draw the text
-    if not ROTATE_180:
-        outline_msg(text, outline_colour, msg_colour, 0, 1)
-    else:
-        outline_msg(text, outline_colour, msg_colour, WIDTH - 1, 9)
+        # draw percentage
+        text_width = graphics.measure_text(f"{progress:.0f}  ", scale=1)
+        if not ROTATE_180:
+            outline_msg(f"{progress:.0f}", outline_pen, msg_pen, WIDTH - text_width + 3, 1)
+            self.draw_percentage(WIDTH - 6, 2)
+        else:
+            outline_msg(f"{progress:.0f}", outline_pen, msg_pen, text_width - 4, 9)
+            self.draw_percentage(-1, 2)
 
-    # draw percentage
-    text_width = graphics.measure_text(f"{progress:.0f}  ", scale=1)
-    if not ROTATE_180:
-        outline_msg(f"{progress:.0f}", outline_colour, msg_colour, WIDTH - text_width + 3, 1)
-        draw_percentage(WIDTH - 6, 2)
-    else:
-        outline_msg(f"{progress:.0f}", outline_colour, msg_colour, text_width - 4, 9)
-        draw_percentage(-1, 2)
-
-    # draw bar background
-    graphics.set_pen(graphics.create_pen(
-        int(KNOWN_COLOURS["grey"][0]), int(KNOWN_COLOURS["grey"][1]), int(KNOWN_COLOURS["grey"][2])))
-    if not ROTATE_180:
-        graphics.rectangle(0, 9, WIDTH, 10)
-    else:
-        graphics.rectangle(0, 0, WIDTH, 2)
+        # draw bar background
+        graphics.set_pen(pens.rgb(lookup_colour("grey")))
+        if not ROTATE_180:
+            graphics.rectangle(0, 9, WIDTH, 10)
+        else:
+            graphics.rectangle(0, 0, WIDTH, 2)
 
-    # draw bar for the current percent
-    graphics.set_pen(bar_colour)
-    if not ROTATE_180:
-        graphics.rectangle(0, 9, int((progress / 100) * WIDTH), 10)
-    else:
-        graphics.rectangle(max(int(WIDTH - ((progress / 100) * WIDTH)), 0), 0, WIDTH, 2)
+        # draw bar for the current percent
+        graphics.set_pen(self.bar_pen)
+        if not ROTATE_180:
+            graphics.rectangle(0, 9, int((progress / 100) * WIDTH), 10)
+        else:
+            graphics.rectangle(max(int(WIDTH - ((progress / 100) * WIDTH)), 0), 0, WIDTH, 2)
+
+        gu.update(graphics)
+
+
+# Build the scene for a decoded payload; None (clear the display) if it has no text.
+def scroll_scene(payload):
+    text, bg_colour, outline_colour, msg_colour, _, melody = parse_msg(payload)
+    if not text:
+        print("clearing screen")
+        return None
+    # play notification sound (replaces any still playing for an earlier message)
+    sequencer.play(melody)
+    return ScrollScene(text, bg_colour, outline_colour, msg_colour)
+
+
+def progress_scene(payload):
+    text, bg_colour, outline_colour, msg_colour, progress, _ = parse_msg(payload)
+    if not text:
+        print("clearing screen")
+        return None
+    return ProgressScene(text, bg_colour, outline_colour, msg_colour, progress)
+
+
+# The single render task. show() posts a scene to a one-slot mailbox (a newer
+# one replaces it) and the renderer swaps it in between frames, so switching
+# costs at most one frame and no task is created or cancelled.
+class Renderer:
+    def __init__(self):
+        self.scene = None
+        self.clock = FrameClock(STEP_MS)
+        self._next = None
+        self._received = None  # ticks_ms when the message for _next arrived
+        self._pending = False
+        self._evt = asyncio.Event()
+
+    # Show scene from the next frame; None clears the display. received is
+    # when its message arrived, to measure the latency to its first frame.
+    def show(self, scene, received=None):
+        self._next = scene
+        self._received = received
+        self._pending = True
+        self._evt.set()
+
+    # Nothing to animate: sleep until show() is called or ms have passed.
+    async def _idle(self, ms=None):
+        self._evt.clear()
+        if self._pending:
+            return
+        try:
+            if ms is None:
+                await self._evt.wait()
+            else:
+                await asyncio.wait_for_ms(self._evt.wait(), ms)
+        except asyncio.TimeoutError:
+            pass
+        self.clock.restart()
+
+    async def run(self):
+        while True:
+            if self._pending:
+                self._pending = False
+                self.scene = self._next
+                self._next = None
+                if self.scene is None:
+                    clear_screen()
+                else:
+                    self._call(self.scene.draw)
+                if self._received is not None:
+                    telemetry.latency_ms.add(time.ticks_diff(time.ticks_ms(), self._received))
+
+            scene = self.scene
+            if scene is None:
+                await self._idle()
+                continue
+
+            remaining = None
+            if scene.expires is not None:
+                remaining = time.ticks_diff(scene.expires, time.ticks_ms())
+                if remaining <= 0:
+                    self.show(None)
+                    continue
+            if not scene.animated:
+                await self._idle(remaining)
+                continue
+
+            steps = await self.clock.wait()
+            if not self._pending and self._call(scene.advance, steps):
+                t = time.ticks_us()
+                self._call(scene.draw)
+                telemetry.frame_us.add(time.ticks_diff(time.ticks_us(), t))
+
+    # Call a scene method. One that raises drops the scene and clears the
+    # display instead of ending the render task.
+    def _call(self, method, *args):
+        try:
+            return method(*args)
+        except Exception as e:
+            print("Scene failed:", e)
+            self.scene = None
+            clear_screen()
+            return False
 
-    gu.update(graphics)
-    await asyncio.sleep(1)
+
+renderer = Renderer()
 
 
 # Respond to incoming messages
 async def messages(client):
-    global current_task
-
-    async for topic, msg, retained in client.queue:
-        # cancel the current task if it exists
-        if current_task and not current_task.done():
-            current_task.cancel()
-            try:
-                await current_task
-            except asyncio.CancelledError:
-                pass
-
-        # incoming message!
-        topic_str = topic.decode()
-        print(f'Topic: "{topic_str}", Retained: {retained}, Message: \n{msg.decode()}')
-
-        # create the new task
-        if topic_str.lower().endswith("/msg"):
-            current_task = asyncio.create_task(handle_scroll_message(topic, msg, retained))
-
-        elif topic_str.lower().endswith("/progress"):
-            current_task = asyncio.create_task(handle_progress_message(topic, msg, retained))
-            pass
+    reconnects = client.reconnects
+    async for entry in client.queue:
+        received = entry[1].received  # Dispatched, so queue wait is included
+        if client.reconnects != reconnects:  # First message since an outage
+            reconnects = client.reconnects
+            telemetry.resume_ms = time.ticks_diff(received, client.down_at)
+        # (topic, message, retained), plus the properties with MQTT v5
+        topic, msg, retained = entry[0], entry[1], entry[2]
+        # incoming message! decode it once and hand the slot back to the client
+        try:
+            payload = msg.decode()
+            topic_str = topic.decode()
+            print(f'Topic: "{topic_str}", Retained: {retained}, Message: \n{payload}')
+
+            # build the new scene; a message that cannot be shown clears the display
+            if topic_str.lower().endswith("/msg"):
+                scene = scroll_scene(payload)
+            elif topic_str.lower().endswith("/progress"):
+                scene = progress_scene(payload)
+            else:
+                continue
+        except Exception as e:
+            print("Bad message:", e)
+            scene = None
+        finally:
+            msg.release()
+
+        # hand the new scene to the renderer
+        renderer.show(scene, received)
 
 
 # Handle button presses
-async def button_handler():
-    global current_task
-    global volume
+# sleep - clear display, stop the current scene and sound
+def on_sleep(event):
+    if event != PRESS:
+        return
+    sequencer.stop()
+    renderer.show(None)
 
-    gu.set_brightness(DEFAULT_BRIGHTNESS)
-    while True:
-        # sleep - clear display and stop running task
-        if gu.is_pressed(GalacticUnicorn.SWITCH_SLEEP):
-            current_task.cancel()
-            graphics.set_pen(graphics.create_pen(0, 0, 0))
-            graphics.clear()
-            gu.update(graphics)
 
-        if not ROTATE_180:
-            # brightness adjust
-            if gu.is_pressed(GalacticUnicorn.SWITCH_BRIGHTNESS_UP):
-                gu.adjust_brightness(+0.1)
-            if gu.is_pressed(GalacticUnicorn.SWITCH_BRIGHTNESS_DOWN):
-                gu.adjust_brightness(-0.1)
-
-            # volume adjust
-            if gu.is_pressed(GalacticUnicorn.SWITCH_VOLUME_UP):
-                volume = min(volume + 0.1, 1)
-            if gu.is_pressed(GalacticUnicorn.SWITCH_VOLUME_DOWN):
-                volume = max(volume - 0.1, 0)
+def adjust_brightness(delta):
+    def handler(event):
+        if event == PRESS or event == REPEAT:
+            gu.adjust_brightness(delta)
+    return handler
 
-        else:
-            # brightness button adjust (inverted)
-            if gu.is_pressed(GalacticUnicorn.SWITCH_BRIGHTNESS_UP):
-                gu.adjust_brightness(-0.1)
-            if gu.is_pressed(GalacticUnicorn.SWITCH_BRIGHTNESS_DOWN):
-                gu.adjust_brightness(+0.1)
 
-            # volume adjust (inverted)
-            if gu.is_pressed(GalacticUnicorn.SWITCH_VOLUME_UP):
-                volume = max(volume - 0.1, 0)
-            if gu.is_pressed(GalacticUnicorn.SWITCH_VOLUME_DOWN):
-                volume = min(volume + 0.1, 1)
+def adjust_volume(delta):
+    def handler(event):
+        if event == PRESS or event == REPEAT:
+            sequencer.volume = min(max(sequencer.volume + delta, 0), 1)
+    return handler
 
-        await asyncio.sleep_ms(200)
+
+# Wire the switches up to their handlers; when rotated the up and down
+# switches are inverted so they still match their position.
+def setup_buttons():
+    gu.set_brightness(DEFAULT_BRIGHTNESS)
+    step = -0.1 if ROTATE_180 else 0.1
+    buttons.on(GalacticUnicorn.SWITCH_SLEEP, on_sleep)
+    buttons.on(GalacticUnicorn.SWITCH_BRIGHTNESS_UP, adjust_brightness(step), repeat=True)
+    buttons.on(GalacticUnicorn.SWITCH_BRIGHTNESS_DOWN, adjust_brightness(-step), repeat=True)
+    buttons.on(GalacticUnicorn.SWITCH_VOLUME_UP, adjust_volume(step), repeat=True)
+    buttons.on(GalacticUnicorn.SWITCH_VOLUME_DOWN, adjust_volume(-step), repeat=True)
 
 
 # Heartbeat connection status
@@ -454,6 +945,30 @@ async def heartbeat(client):
         await asyncio.sleep_ms(sleep_value)
 
 
+# Publish a status report to TOPIC_PREFIX/status every STATUS_INTERVAL seconds
+async def status(client):
+    wlan = network.WLAN(network.STA_IF)
+    while True:
+        await asyncio.sleep(STATUS_INTERVAL)
+        if not client.isconnected():
+            continue
+        try:
+            rssi = wlan.status("rssi")
+        except (OSError, ValueError):
+            rssi = None
+        doc = telemetry.status(
+            dropped=renderer.clock.dropped,
+            discards=client.queue.discards,
+            reconnects=client.reconnects,
+            rssi=rssi,
+            wifi_ms=client.wifi_ms,
+            broker_ms=client.broker_ms,
+            outage_ms=client.outage_ms,
+            session_present=client.session_present,
+        )
+        await client.publish(TOPIC_PREFIX + "/status", doc)
+
+
 # Respond to connectivity being (re)established
 async def up(client):
     while True:
@@ -461,9 +976,9 @@ async def up(client):
         await client.up.wait()
         client.up.clear()
 
-        # renew subscriptions
-        await client.subscribe(TOPIC_PREFIX + "/msg", 1)
-        await client.subscribe(TOPIC_PREFIX + "/progress", 1)
+        # renew subscriptions, unless the broker kept them in our session
+        if not client.session_present:
+            await client.subscribe_many(((TOPIC_PREFIX + "/msg", 1), (TOPIC_PREFIX + "/progress", 1)))
 
 
 async def main(client):
@@ -471,7 +986,12 @@ async def main(client):
     asyncio.create_task(heartbeat(client))
 
     # button handler
-    asyncio.create_task(button_handler())
+    setup_buttons()
+    asyncio.create_task(buttons.run())
+
+    # display and notification sounds
+    asyncio.create_task(renderer.run())
+    asyncio.create_task(sequencer.run())
 
     try:
         # connect to wifi and MQTT broker
@@ -482,23 +1002,34 @@ async def main(client):
         print("Connection failed")
         return
 
-    # handle messages
-    for coroutine in (up, messages):
+    # handle messages, report status
+    for coroutine in (up, messages, status):
         asyncio.create_task(coroutine(client))
 
     while True:
         await asyncio.sleep(5)
 
 
-# setup MQTT client
-config["queue_len"] = 1
-MQTTClient.DEBUG = False  # Optional
-client = MQTTClient(config)
+# setup MQTT client (skipped when imported, e.g. for profiling off-device)
+if __name__ == "__main__":
+    config["queue_len"] = 2  # One slot each for /msg and /progress
+    config["queue_coalesce"] = True  # Only the newest message per topic is kept
+    config["stream_io"] = True  # Sleep until the socket is ready instead of polling
+    config["max_payload"] = 2048  # Larger messages are dropped unread
+    config["lease_slots"] = 3  # Payload slots: one per queue entry plus the one being handled
+    config["lease_size"] = 256  # Bytes per slot: typical payloads, not max_payload
+    config["topic_alias_max"] = 4  # With config["mqttv5"] set in mqtt_config.py
+    config["fast_resume"] = True  # Reconnect straight to the broker while Wi-Fi is up
+    config["gc_collect"] = telemetry.collect  # Time the client's periodic collections
+    config["clean"] = False  # Keep the session (and subscriptions) over a reconnect
+    config["mqttv5_con_props"] = {0x11: 3600}  # v5 only: keep the session an hour
+    MQTTClient.DEBUG = False  # Optional
+    client = MQTTClient(config)
 
-try:
-    asyncio.run(main(client))
-except Exception as e:
-    print(e)
-finally:
-    client.close()  # Prevent LmacRxBlk:1 errors
-    asyncio.new_event_loop()
+    try:
+        asyncio.run(main(client))
+    except Exception as e:
+        print(e)
+    finally:
+        client.close()  # Prevent LmacRxBlk:1 errors
+        asyncio.new_event_loop()
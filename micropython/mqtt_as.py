@@ -32,6 +32,17 @@ VERSION = (0, 8, 4)
 # Default initial size for input messge buffer. Increase this if large messages
 # are expected, but rarely, to avoid big runtime allocations
 IBUFSIZE = 50
+# Initial size of the receive buffer wait_msg() batches incoming packets in. It
+# grows to hold a larger packet, up to config["max_payload"], and shrinks back
+# once that has been handled.
+RBUFSIZE = 256
+# Received topics are kept and reused for later messages with the same topic;
+# this many of the most recent ones.
+INTERN_SIZE = 8
+# Size of the reusable buffer outgoing packets are assembled in, enough for
+# the scroller's status reports. A larger packet is assembled in a one-off
+# buffer, so every packet still goes out in a single write.
+OBUFSIZE = 384
 # By default the callback interface returns and incoming message as bytes.
 # For performance reasons with large messages it may return a memoryview.
 MSG_BYTES = True
@@ -56,6 +67,59 @@ async def eliza(*_):  # e.g. via set_wifi_handler(coro): see test program
     await asyncio.sleep_ms(0)
 
 
+# A payload held in a slot of a LeasePool, as queued in leasing mode (which
+# needs a queue_len of 2 or more). The consumer must call release() when done
+# with it; decode() does not.
+class Lease:
+    def __init__(self, pool, size):
+        self._pool = pool
+        self._buf = bytearray(size)
+        self._mv = memoryview(self._buf)
+        self.view = self._mv[:0]  # The payload
+        self.received = 0  # ticks_ms when the message was dispatched
+
+    def _fill(self, data):
+        n = len(data)
+        self._buf[:n] = data
+        self.view = self._mv[:n]
+        self.received = ticks_ms()
+
+    def __len__(self):
+        return len(self.view)
+
+    def decode(self):
+        return str(self.view, "utf-8")
+
+    def release(self):
+        pool = self._pool
+        if pool is not None and self not in pool._free:
+            pool._free.append(self)
+
+
+# Preallocated payload slots. A payload that is too big, or arrives when every
+# slot is taken, gets a one-off Lease that is simply dropped on release.
+class LeasePool:
+    def __init__(self, count, size):
+        self.size = size
+        self._free = [Lease(self, size) for _ in range(count)]
+        self.exhausted = 0  # One-off leases handed out
+
+    def lease(self, data):
+        if len(data) <= self.size and self._free:
+            lease = self._free.pop()
+        else:
+            self.exhausted += 1
+            lease = Lease(None, len(data))
+        lease._fill(data)
+        return lease
+
+
+# Release the payload of a queue entry that is being thrown away.
+def _discard(entry):
+    if isinstance(entry[1], Lease):
+        entry[1].release()
+
+
 class MsgQueue:
     def __init__(self, size):
         self._q = [0 for _ in range(max(size, 4))]
@@ -70,6 +134,8 @@ class MsgQueue:
         self._evt.set()
         self._wi = (self._wi + 1) % self._size
         if self._wi == self._ri:  # Would indicate empty
+            if self._size > 1:  # Else this is the message just put
+                _discard(self._q[self._ri])
             self._ri = (self._ri + 1) % self._size  # Discard a message
             self.discards += 1
 
@@ -85,6 +151,58 @@ class MsgQueue:
         return r
 
 
+# Keeps only the newest message per topic. Entries wait in arrival order in
+# a preallocated ring of size slots; a message for a topic that is already
+# queued overwrites it in place. Only when size distinct topics are pending is
+# the oldest entry dropped.
+class CoalescingQueue:
+    def __init__(self, size):
+        self._q = [None] * size
+        self._size = size
+        self._ri = 0
+        self._n = 0
+        self._evt = asyncio.Event()
+        self.discards = 0  # Total of the two counts below
+        self.superseded = {}  # topic: messages overwritten by a newer one
+        self.overflows = {}  # topic: messages dropped for lack of a slot
+
+    def put(self, topic, *v):
+        q = self._q
+        size = self._size
+        i = self._ri
+        for _ in range(self._n):
+            if q[i][0] == topic:
+                _discard(q[i])
+                q[i] = (topic,) + v
+                self.superseded[topic] = self.superseded.get(topic, 0) + 1
+                self.discards += 1
+                return
+            i = (i + 1) % size
+        if self._n == size:  # Full: discard the oldest
+            _discard(q[self._ri])
+            old = q[self._ri][0]
+            self.overflows[old] = self.overflows.get(old, 0) + 1
+            self.discards += 1
+            self._ri = (self._ri + 1) % size
+            self._n -= 1
+        q[(self._ri + self._n) % size] = (topic,) + v
+        self._n += 1
+        self._evt.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._n:  # Empty
+            self._evt.clear()
+            await self._evt.wait()
+        r = self._q[self._ri]
+        self._q[self._ri] = None
+        self._ri = (self._ri + 1) % self._size
+        self._n -= 1
+        return r
+
+
 config = {
     "client_id": hexlify(unique_id()),
     "server": None,
@@ -106,9 +224,17 @@ config = {
     "ssid": None,
     "wifi_pw": None,
     "queue_len": 0,
+    "queue_coalesce": False,
+    "stream_io": False,
+    "max_payload": 0,
+    "fast_resume": False,
+    "lease_slots": 0,
+    "lease_size": 0,
+    "gc_collect": gc.collect,
     "gateway": False,
     "mqttv5": False,
     "mqttv5_con_props": None,
+    "topic_alias_max": 0,
 }
 
 
@@ -138,8 +264,42 @@ def vbi(buf: bytearray, offs: int, x: int):
     return vbi(buf, offs + 1, x) if x else (offs + 1)
 
 
+# Topics and payloads may be given as str: encode them so they can be copied
+# into a packet and their lengths are byte counts.
+def as_bytes(s):
+    return s.encode() if isinstance(s, str) else s
+
+
+# Copy data into buf at offs. Returns the end offset.
+def put(buf, offs, data):
+    end = offs + len(data)
+    buf[offs:end] = data
+    return end
+
+
+# Store an MQTT string (2 byte length then the data) in buf at offs. Returns
+# the end offset.
+def put_str(buf, offs, s):
+    struct.pack_into("!H", buf, offs, len(s))
+    return put(buf, offs + 2, s)
+
+
+# Decode a variable byte integer from buf at offs. Returns (value, end offset).
+def vbi_at(buf, offs):
+    x = 0
+    shift = 0
+    while True:
+        b = buf[offs]
+        offs += 1
+        x |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return x, offs
+        shift += 7
+
+
 encode_properties = None
 decode_properties = None
+scan_properties = None
 
 
 class MQTT_base:
@@ -173,7 +333,10 @@ class MQTT_base:
         if self._events:
             self.up = asyncio.Event()
             self.down = asyncio.Event()
-            self.queue = MsgQueue(config["queue_len"])
+            if config["queue_coalesce"]:
+                self.queue = CoalescingQueue(config["queue_len"])
+            else:
+                self.queue = MsgQueue(config["queue_len"])
             self._cb = self.queue.put
         else:  # Callbacks
             self._cb = config["subs_cb"]
@@ -201,18 +364,41 @@ class MQTT_base:
 
         self.newpid = pid_gen()
         self.rcv_pids = set()  # PUBACK and SUBACK pids awaiting ACK response
+        self._ack_counts = {}  # [UN]SUBSCRIBE pid: topics in it
         self.last_rx = ticks_ms()  # Time of last communication from broker
         self.lock = asyncio.Lock()
         self._ibuf = bytearray(IBUFSIZE)
         self._mvbuf = memoryview(self._ibuf)
+        self._rbuf = bytearray(RBUFSIZE)  # Received bytes not yet dispatched
+        self._rmv = memoryview(self._rbuf)
+        self._rlen = 0
+        self._skip = 0  # Bytes of a rejected PUBLISH still to be dropped
+        # PUBLISH packets with a longer topic and payload are dropped unread
+        self._max_payload = config["max_payload"]
+        self.ibuf_peak = RBUFSIZE  # Largest the receive buffer has grown to
+        self.rejected_msgs = 0
+        self.rejected_bytes = 0
+        self._obuf = bytearray(OBUFSIZE)  # Outgoing packet being assembled
+        # Leasing mode: queued payloads are Lease objects in pooled slots
+        self._pool = None
+        if self._events and config["lease_slots"]:
+            # Slots sized for typical payloads; rare larger ones get one-off leases
+            self._pool = LeasePool(config["lease_slots"], config["lease_size"] or RBUFSIZE)
+        self._stream_io = config["stream_io"]  # Sleep until the socket is ready
+        self._stream = None
 
         self.mqttv5 = config.get("mqttv5")
         self.mqttv5_con_props = config.get("mqttv5_con_props")
-        self.topic_alias_maximum = 0
+        self.topic_alias_maximum = 0  # Aliases the broker accepts from us
+        # Topic aliases we accept from the broker, advertised in CONNECT
+        self._alias_max = config["topic_alias_max"] if self.mqttv5 else 0
+        self._aliases = [None] * (self._alias_max + 1)  # alias: topic
+        self._interned = [None] * INTERN_SIZE  # Recent topics, shared by every message
+        self._intern_next = 0
 
         if self.mqttv5:
-            global encode_properties, decode_properties
-            from .mqtt_v5_properties import encode_properties, decode_properties  # noqa
+            global encode_properties, decode_properties, scan_properties
+            from mqtt_v5_properties import encode_properties, decode_properties, scan_properties  # noqa
 
     def _set_last_will(self, topic, msg, retain=False, qos=0):
         qos_check(qos)
@@ -251,6 +437,14 @@ class MQTT_base:
                 msg_size = None
                 if e.args[0] not in BUSY_ERRORS:
                     raise
+            if msg_size is None and self._stream is not None and sock is self._sock:
+                # Nothing ready: sleep until there is, or the response time is up
+                try:
+                    msg_size = await asyncio.wait_for_ms(
+                        self._stream.readinto(buffer[size:n]), self._response_time - ticks_diff(ticks_ms(), t)
+                    )
+                except asyncio.TimeoutError:
+                    continue
             if msg_size == 0:  # Connection closed by host
                 raise OSError(-1, "Connection closed by host")
             if msg_size is not None:  # data received
@@ -281,6 +475,14 @@ class MQTT_base:
             if n:
                 t = ticks_ms()
                 bytes_wr = bytes_wr[n:]
+            if bytes_wr and self._stream is not None and sock is self._sock:
+                # Send buffer full: let the stream finish once it is writable
+                self._stream.write(bytes_wr)
+                try:
+                    await asyncio.wait_for_ms(self._stream.drain(), self._response_time)
+                except asyncio.TimeoutError:
+                    raise OSError(-1, "Timeout on socket write")
+                return
             await asyncio.sleep_ms(0)
 
     async def _send_str(self, s):
@@ -295,6 +497,10 @@ class MQTT_base:
 
     async def _connect(self, clean):
         mqttv5 = self.mqttv5  # Cache local
+        self._rlen = 0  # Discard anything left over from an earlier connection
+        self._skip = 0
+        for alias in range(len(self._aliases)):  # Aliases only last for a connection
+            self._aliases[alias] = None
         self._sock = socket.socket()
         self._sock.setblocking(False)
         try:
@@ -311,6 +517,7 @@ class MQTT_base:
                 import ussl as ssl
 
             self._sock = ssl.wrap_socket(self._sock, **self._ssl_params)
+        self._stream = asyncio.StreamReader(self._sock) if self._stream_io else None
         premsg = bytearray(b"\x10\0\0\0\0\0")
         msg = bytearray(b"\x04MQTT\x00\0\0\0")
         msg[5] = 0x05 if mqttv5 else 0x04
@@ -332,7 +539,11 @@ class MQTT_base:
             msg[6] |= self._lw_retain << 5
 
         if mqttv5:
-            properties = encode_properties(self.mqttv5_con_props)
+            properties = self.mqttv5_con_props
+            if self._alias_max:
+                properties = dict(properties) if properties else {}
+                properties[0x22] = self._alias_max  # Topic Alias Maximum
+            properties = encode_properties(properties)
             sz += len(properties)
 
         i = vbi(premsg, 1, sz)  # sz -> Variable Byte Integer
@@ -366,9 +577,10 @@ class MQTT_base:
         # Only read the first 2 bytes, as properties have their own length
         connack_resp = await self._as_read(2)
 
-        # Connect ack flags
-        if connack_resp[0] != 0:
-            raise OSError(-1, "CONNACK flags not 0")
+        # Connect ack flags: only Session Present (bit 0) may be set
+        if connack_resp[0] & 0xFE:
+            raise OSError(-1, "CONNACK flags 0x%x" % connack_resp[0])
+        self.session_present = bool(connack_resp[0] & 1)
         # Reason code
         if connack_resp[1] != 0:
             # On MQTTv5 Reason codes below 128 may need to be handled
@@ -492,9 +704,15 @@ class MQTT_base:
             count += 1
             self.REPUB_COUNT += 1
 
+    # Buffer to assemble an outgoing packet of up to n bytes in. Packets are
+    # built and sent under the lock, so the preallocated one can be reused.
+    def _outbuf(self, n):
+        return self._obuf if n <= len(self._obuf) else bytearray(n)
+
+    # The whole packet, payload included, goes out in a single write.
     async def _publish(self, topic, msg, retain, qos, dup, pid, properties=None):
-        pkt = bytearray(b"\x30\0\0\0")
-        pkt[0] |= qos << 1 | retain | dup << 3
+        topic = as_bytes(topic)
+        msg = as_bytes(msg)
         sz = 2 + len(topic) + len(msg)
         if qos > 0:
             sz += 2
@@ -503,50 +721,66 @@ class MQTT_base:
             properties = encode_properties(properties)
             sz += len(properties)
 
-        await self._as_write(pkt, vbi(pkt, 1, sz))  # Encode size as VBI
-        await self._send_str(topic)
+        buf = self._outbuf(5 + sz)  # Allowing for the longest size VBI
+        buf[0] = 0x30 | qos << 1 | retain | dup << 3
+        i = vbi(buf, 1, sz)  # Encode size as VBI
+        i = put_str(buf, i, topic)
         if qos > 0:
-            struct.pack_into("!H", pkt, 0, pid)
-            await self._as_write(pkt, 2)
+            struct.pack_into("!H", buf, i, pid)
+            i += 2
         if self.mqttv5:
-            await self._as_write(properties)
-        await self._as_write(msg)
+            i = put(buf, i, properties)
+        i = put(buf, i, msg)
+        await self._as_write(buf, i)
 
     async def subscribe(self, topic, qos, properties=None):
-        await self._usub(topic, qos, properties)
+        await self._usub(((topic, qos),), True, properties)
+
+    # Subscribe to several topics, given as (topic, qos) pairs, with a single
+    # SUBSCRIBE packet and SUBACK.
+    async def subscribe_many(self, topics, properties=None):
+        await self._usub(topics, True, properties)
 
     async def unsubscribe(self, topic, properties=None):
-        await self._usub(topic, None, properties)
+        await self._usub(((topic, None),), False, properties)
 
-    # Subscribe/unsubscribe
+    # Subscribe/unsubscribe to (topic, qos) pairs; qos is ignored when
+    # unsubscribing.
     # Can raise OSError if WiFi fails. Subclass traps.
-    async def _usub(self, topic, qos, properties):
-        sub = qos is not None
-        pkt = bytearray(7)
-        pkt[0] = 0x82 if sub else 0xA2
+    async def _usub(self, topics, sub, properties):
         pid = next(self.newpid)
-        self.rcv_pids.add(pid)
-        # 2 bytes of PID + 2 bytes of topic length + len(topic)
-        sz = 2 + 2 + len(topic) + (1 if sub else 0)
+        topics = [(as_bytes(topic), qos) for topic, qos in topics]
+        # 2 bytes of PID, then 2 bytes of topic length + len(topic) per topic
+        sz = 2
+        for topic, _ in topics:
+            sz += 2 + len(topic) + (1 if sub else 0)
         if self.mqttv5:
             # Return length as VBI followed by properties or b'\0'
             properties = encode_properties(properties)
             sz += len(properties)
-        offs = vbi(pkt, 1, sz)  # Store size as variable byte integer
-        struct.pack_into("!H", pkt, offs, pid)
+        self.rcv_pids.add(pid)
+        self._ack_counts[pid] = len(topics)  # One reason code per topic
 
         async with self.lock:
-            await self._as_write(pkt, offs + 2)
+            buf = self._outbuf(5 + sz)
+            buf[0] = 0x82 if sub else 0xA2
+            i = vbi(buf, 1, sz)  # Store size as variable byte integer
+            struct.pack_into("!H", buf, i, pid)
+            i += 2
             if self.mqttv5:
-                await self._as_write(properties)
-            await self._send_str(topic)
-            if sub:
-                # Only QoS is supported other features such as:
-                # (NL) No Local, (RAP) Retain As Published and Retain Handling.
-                # Are not supported.
-                await self._as_write(qos.to_bytes(1, "little"))
+                i = put(buf, i, properties)
+            for topic, qos in topics:
+                i = put_str(buf, i, topic)
+                if sub:
+                    # Only QoS is supported other features such as:
+                    # (NL) No Local, (RAP) Retain As Published and Retain Handling.
+                    # Are not supported.
+                    buf[i] = qos
+                    i += 1
+            await self._as_write(buf, i)
 
         if not await self._await_pid(pid):
+            self._ack_counts.pop(pid, None)
             raise OSError(-1)
 
     # Remove a pending pid after a successful receive.
@@ -556,125 +790,270 @@ class MQTT_base:
         else:
             raise OSError(-1, f"Invalid pid in {msg} packet")
 
-    # Wait for a single incoming MQTT message and process it.
-    # Subscribed messages are delivered to a callback previously
-    # set by .setup() method. Other (internal) MQTT
-    # messages processed internally.
-    # Immediate return if no data available. Called from ._handle_msg().
-    async def wait_msg(self):
+    # Read everything the socket has ready into the receive buffer, stopping
+    # when it is full. Returns the number of bytes read.
+    def _fill(self):
+        got = 0
+        while self._rlen < len(self._rbuf):
+            try:
+                n = self._sock.readinto(self._rmv[self._rlen :])  # Throws OSError on WiFi fail
+            except OSError as e:
+                if e.args[0] in BUSY_ERRORS:  # Needed by RP2
+                    break
+                raise
+            if n is None:  # Nothing more waiting
+                break
+            if n == 0:
+                raise OSError(-1, "Empty response")  # Can happen on broker fail
+            self._received(n)
+            got += n
+        return got
+
+    # Account for n bytes read into the buffer at ._rlen, dropping any that
+    # belong to a rejected PUBLISH.
+    def _received(self, n):
+        self.last_rx = ticks_ms()
+        skip = self._skip
+        if skip:
+            drop = min(skip, n)
+            self._skip = skip - drop
+            if drop < n:  # The next packet starts in this read
+                start = self._rlen
+                self._rbuf[start : start + n - drop] = self._rbuf[start + drop : start + n]
+            n -= drop
+        self._rlen += n
+
+    # Process incoming MQTT messages. Everything available is read in one go
+    # and every complete packet in it dispatched; a partial packet stays in
+    # the buffer until the rest arrives. Subscribed messages are delivered to
+    # the callback or queue, other (internal) MQTT messages processed
+    # internally. Immediate return if no data available; otherwise returns
+    # True. got is the number of bytes the caller has already added to the
+    # buffer. Called from ._handle_msg().
+    async def wait_msg(self, got=0):
+        if not self._fill() and not got:
+            return False
+        buf = self._rbuf
+        rlen = self._rlen
+        pos = 0
+        need = 0  # Size of a packet that is not complete yet
+        acks = None
+        while rlen - pos >= 2:
+            # Fixed header: packet type then remaining length (may be incomplete)
+            sz = 0
+            shift = 0
+            i = pos + 1
+            while i < rlen:
+                b = buf[i]
+                i += 1
+                sz |= (b & 0x7F) << shift
+                if not b & 0x80:
+                    break
+                shift += 7
+                if shift > 21:
+                    raise OSError(-1, "Invalid remaining length")
+            else:
+                break  # Length still arriving
+            if self._max_payload and sz > self._max_payload and buf[pos] & 0xF0 == 0x30:
+                # Oversized PUBLISH: drop it, and the rest of it as it arrives,
+                # but acknowledge it so the broker does not redeliver it, and
+                # record its topic alias for the messages that follow
+                qos = buf[pos] & 6
+                pid = None
+                if qos or self.mqttv5:
+                    # Wait for the topic, pid and properties, up to h
+                    h = i + 2
+                    if h <= rlen:
+                        t = h + (buf[i] << 8 | buf[i + 1])  # End of the topic
+                        h = t + (2 if qos else 0)
+                        if self.mqttv5:
+                            p = h  # Last byte of the properties length
+                            while p < rlen and buf[p] & 0x80:
+                                p += 1
+                            if p < rlen:
+                                props_sz, p = vbi_at(buf, h)
+                                h = p + props_sz
+                            else:
+                                h = p + 1
+                    if h - i > min(sz, self._max_payload):
+                        raise OSError(-1, "Invalid PUBLISH header")
+                    if h > rlen:
+                        need = h - pos
+                        break
+                    if qos == 4:  # qos 2 not supported
+                        raise OSError(-1, "QoS 2 not supported")
+                    if qos:
+                        pid = buf[t] << 8 | buf[t + 1]
+                    if self.mqttv5:
+                        alias, _ = scan_properties(buf, p, h, 0x23)
+                        if alias:
+                            self._topic(self._rmv[i + 2 : t], alias)
+                self.rejected_msgs += 1
+                self.rejected_bytes += i + sz - pos
+                if i + sz > rlen:
+                    self._skip = i + sz - rlen
+                    pos = rlen
+                else:
+                    pos = i + sz
+            elif i + sz > rlen:
+                need = i + sz - pos
+                break
+            else:
+                pid = self._dispatch(buf[pos], i, i + sz)
+                pos = i + sz
+            if pid is not None:  # qos 1: PUBACKs are sent together
+                if acks is None:
+                    acks = bytearray()
+                acks.extend(b"\x40\x02")
+                acks.extend(struct.pack("!H", pid))
+
+        # Move any partial packet to the front, growing the buffer to fit it.
+        # Once empty, a grown buffer goes back to its initial size.
+        rest = rlen - pos
+        if need > len(buf):
+            self._rbuf = bytearray(need + 50)
+            self._rbuf[:rest] = buf[pos:rlen]
+            self._rmv = memoryview(self._rbuf)
+            self.ibuf_peak = max(self.ibuf_peak, len(self._rbuf))
+        elif not rest and len(buf) > RBUFSIZE:
+            self._rbuf = bytearray(RBUFSIZE)
+            self._rmv = memoryview(self._rbuf)
+        elif pos and rest:
+            buf[:rest] = buf[pos:rlen]
+        self._rlen = rest
+
+        if acks is not None:
+            await self._as_write(acks)
+        return True
+
+    # The topic of a PUBLISH as an interned bytes object: name is the topic
+    # name in the receive buffer, which is empty when the broker sends just
+    # the topic alias.
+    def _topic(self, name, alias):
+        if alias:
+            if alias > self._alias_max:
+                raise OSError(-1, "Invalid topic alias %d" % alias)
+            if not name:
+                topic = self._aliases[alias]
+                if topic is None:
+                    raise OSError(-1, "Unknown topic alias %d" % alias)
+                return topic
+        # Reuse an earlier copy of the topic if there is one
+        n = len(name)
+        for topic in self._interned:
+            if topic is not None and len(topic) == n and name == topic:
+                break
+        else:
+            topic = bytes(name)  # Copy before re-using the read buffer
+            self._interned[self._intern_next] = topic
+            self._intern_next = (self._intern_next + 1) % INTERN_SIZE
+        if alias:
+            self._aliases[alias] = topic
+        return topic
+
+    # Handle one complete packet with body buf[start:end]. Returns the pid of
+    # a qos 1 PUBLISH, which must be acknowledged.
+    def _dispatch(self, op, start, end):
         mqttv5 = self.mqttv5  # Cache local
-        try:
-            res = self._sock.read(1)  # Throws OSError on WiFi fail
-        except OSError as e:
-            if e.args[0] in BUSY_ERRORS:  # Needed by RP2
-                await asyncio.sleep_ms(0)
-                return
-            raise
+        buf = self._rbuf
+        mv = self._rmv
+        sz = end - start
 
-        if res is None:
-            return
-        if res == b"":
-            raise OSError(-1, "Empty response")  # Can happen on broker fail
-
-        if res == b"\xd0":  # PINGRESP
-            await self._as_read(1)  # Update .last_rx time
-            return
-        op = res[0]
+        if op == 0xD0:  # PINGRESP: .last_rx already updated
+            return None
 
         if op == 0x40:  # PUBACK
-            sz, _ = await self._recv_len()
             if not mqttv5 and sz != 2:
                 raise OSError(-1, "Invalid PUBACK packet")
-            rcv_pid = await self._as_read(2)
-            pid = rcv_pid[0] << 8 | rcv_pid[1]
+            pid = buf[start] << 8 | buf[start + 1]
             # For some reason even on MQTTv5 reason code is optional
-            if sz != 2:
-                reason_code = await self._as_read(1)
-                reason_code = reason_code[0]
+            if sz > 2:
+                reason_code = buf[start + 2]
                 if reason_code >= 0x80:
                     raise OSError(-1, "PUBACK reason code 0x%x" % reason_code)
             if sz > 3:
-                puback_props_sz, _ = await self._recv_len()
-                if puback_props_sz > 0:
-                    puback_props = await self._as_read(puback_props_sz)
-                    decoded_props = decode_properties(puback_props, puback_props_sz)
+                puback_props_sz, i = vbi_at(buf, start + 3)
+                if puback_props_sz > 0 and self.DEBUG:
+                    decoded_props = decode_properties(mv[i : i + puback_props_sz], puback_props_sz)
                     self.dprint("PUBACK properties %s", decoded_props)
             # No exception thrown: PUBACK successfuly received. Remove pending PID
             self.kill_pid(pid, "PUBACK")
+            return None
 
         if op == 0x90 or op == 0xB0:  # [UN]SUBACK
             un = "UN" if op == 0xB0 else ""
             suback = op == 0x90
-            sz, _ = await self._recv_len()
-            rcv_pid = await self._as_read(2)
-            pid = rcv_pid[0] << 8 | rcv_pid[1]
-            sz -= 2
+            pid = buf[start] << 8 | buf[start + 1]
+            i = start + 2
             # Handle properties
             if mqttv5:
-                suback_props_sz, sz_len = await self._recv_len()
-                sz -= sz_len
-                sz -= suback_props_sz
-                if suback_props_sz > 0:
-                    suback_props = await self._as_read(suback_props_sz)
-                    decoded_props = decode_properties(suback_props, suback_props_sz)
+                suback_props_sz, i = vbi_at(buf, i)
+                if suback_props_sz > 0 and self.DEBUG:
+                    decoded_props = decode_properties(mv[i : i + suback_props_sz], suback_props_sz)
                     self.dprint("[UN] SUBACK properties %s", decoded_props)
+                i += suback_props_sz
 
-            if sz > 1:
-                raise OSError(-1, "Got too many bytes")
+            # A reason code per topic (none for an MQTT 3.1.1 UNSUBACK)
+            count = self._ack_counts.pop(pid, 1)
             if suback or mqttv5:
-                reason_code = await self._as_read(sz)
-                reason_code = reason_code[0]
-                if reason_code >= 0x80:
-                    raise OSError(-1, f"{un}SUBACK reason code 0x{reason_code:x}")
+                if end - i != count:
+                    raise OSError(-1, f"{un}SUBACK has {end - i} reason codes for {count} topics")
+                while i < end:
+                    reason_code = buf[i]
+                    if reason_code >= 0x80:
+                        raise OSError(-1, f"{un}SUBACK reason code 0x{reason_code:x}")
+                    i += 1
+            elif end != i:
+                raise OSError(-1, "Invalid UNSUBACK packet")
             self.kill_pid(pid, f"{un}SUBACK")
+            return None
 
         if op == 0xE0:  # DISCONNECT
-            if mqttv5:
-                sz, _ = await self._recv_len()
-                reason_code = await self._as_read(1)
-                reason_code = reason_code[0]
-
-                sz -= 1
-                if sz > 0:
-                    dis_props_sz, dis_len = await self._recv_len()
-                    sz -= dis_len
-                    disconnect_props = await self._as_read(dis_props_sz)
-                    decoded_props = decode_properties(disconnect_props, dis_props_sz)
+            if mqttv5 and sz:
+                reason_code = buf[start]
+                if sz > 1 and self.DEBUG:
+                    dis_props_sz, i = vbi_at(buf, start + 1)
+                    decoded_props = decode_properties(mv[i : i + dis_props_sz], dis_props_sz)
                     self.dprint("DISCONNECT properties %s", decoded_props)
 
                 if reason_code >= 0x80:
                     raise OSError(-1, "DISCONNECT reason code 0x%x" % reason_code)
+            return None
 
         if op & 0xF0 != 0x30:
-            return
+            return None
 
-        sz, _ = await self._recv_len()
-        topic_len = await self._as_read(2)
-        topic_len = (topic_len[0] << 8) | topic_len[1]
-        topic = await self._as_read(topic_len)
-        topic = bytes(topic)  # Copy before re-using the read buffer
-        sz -= topic_len + 2
+        topic_len = buf[start] << 8 | buf[start + 1]
+        i = start + 2 + topic_len
+        name = mv[start + 2 : i]
+        pid = None
         # MQTT V3.1.1 section 2.3.1 non-normative comment. Get server PID.
         if op & 6:  # This is distinct from client PIDs.
-            pid = await self._as_read(2)
-            pid = pid[0] << 8 | pid[1]
-            sz -= 2
+            pid = buf[i] << 8 | buf[i + 1]
+            i += 2
 
         decoded_props = None
+        alias = 0
         if mqttv5:
-            pub_props_sz, pub_props_sz_len = await self._recv_len()
-            sz -= pub_props_sz_len
-            sz -= pub_props_sz
+            pub_props_sz, i = vbi_at(buf, i)
             if pub_props_sz > 0:
-                pub_props = await self._as_read(pub_props_sz)
-                decoded_props = decode_properties(pub_props, pub_props_sz)
-
-        msg = await self._as_read(sz)
+                # Read the Topic Alias in place; only decode the properties
+                # into a dict for the application if there are others.
+                alias, others = scan_properties(buf, i, i + pub_props_sz, 0x23)
+                if others:
+                    decoded_props = decode_properties(mv[i : i + pub_props_sz], pub_props_sz)
+            i += pub_props_sz
+        topic = self._topic(name, alias)
+
+        msg = mv[i:end]
         # In event mode we must copy the message otherwise .queue contents will be wrong:
         # every entry would contain the same message.
         # In callback mode not copying the message is OK so long as the callback is purely
         # synchronous. Overruns can't occur because of the lock.
-        if self._events or MSG_BYTES:
+        # In leasing mode the message is copied into a pooled slot instead.
+        if self._pool is not None:
+            msg = self._pool.lease(msg)
+        elif self._events or MSG_BYTES:
             msg = bytes(msg)
         retained = op & 0x01
         args = [topic, msg, bool(retained)]
@@ -682,12 +1061,9 @@ class MQTT_base:
             args.append(decoded_props)
         self._cb(*args)
 
-        if op & 6 == 2:  # qos 1
-            pkt = bytearray(b"\x40\x02\0\0")  # Send PUBACK
-            struct.pack_into("!H", pkt, 2, pid)
-            await self._as_write(pkt)
-        elif op & 6 == 4:  # qos 2 not supported
+        if op & 6 == 4:  # qos 2 not supported
             raise OSError(-1, "QoS 2 not supported")
+        return pid
 
 
 # MQTTClient class. Handles issues relating to connectivity.
@@ -704,6 +1080,17 @@ class MQTTClient(MQTT_base):
             self._ping_interval = p_i
         self._in_connect = False
         self._has_connected = False  # Define 'Clean Session' value to use.
+        self.reconnects = 0  # Outages since the first connection
+        # Reconnect without reassociating while Wi-Fi is still up, skipping the
+        # Wi-Fi integrity check
+        self._fast_resume = config["fast_resume"]
+        self._gc_collect = config["gc_collect"]  # e.g. a timed collection
+        self.session_present = False  # The broker kept our session (clean=False)
+        # Connect phase timings (ms) of the last (re)connection
+        self.down_at = ticks_ms()  # When the last outage started
+        self.wifi_ms = 0  # Wi-Fi (re)association, 0 if it was still up
+        self.broker_ms = 0  # CONNECT until CONNACK
+        self.outage_ms = 0  # Outage start until connected again
         self._tasks = []
         if ESP8266:
             import esp
@@ -780,6 +1167,7 @@ class MQTTClient(MQTT_base):
             # blocking during later internet outage:
             self._addr = socket.getaddrinfo(self.server, self.port)[0][-1]
         self._in_connect = True  # Disable low level ._isconnected check
+        t = ticks_ms()
         try:
             is_clean = self._clean
             if not self._has_connected and self._clean_init and not self._clean:
@@ -803,7 +1191,11 @@ class MQTTClient(MQTT_base):
             self._in_connect = False  # Caller may run .isconnected()
             raise
         self.rcv_pids.clear()
+        self._ack_counts.clear()
         # If we get here without error broker/LAN must be up.
+        self.broker_ms = ticks_diff(ticks_ms(), t)
+        if self._has_connected:
+            self.outage_ms = ticks_diff(ticks_ms(), self.down_at)
         self._isconnected = True
         self._in_connect = False  # Low level code can now check connectivity.
         if not self._events:
@@ -813,7 +1205,7 @@ class MQTTClient(MQTT_base):
             asyncio.create_task(self._keep_connected())
             # Runs forever unless user issues .disconnect()
 
-        asyncio.create_task(self._handle_msg())  # Task quits on connection fail.
+        self._tasks.append(asyncio.create_task(self._handle_msg()))  # Task quits on connection fail.
         self._tasks.append(asyncio.create_task(self._keep_alive()))
         if self.DEBUG:
             self._tasks.append(asyncio.create_task(self._memory()))
@@ -827,11 +1219,23 @@ class MQTTClient(MQTT_base):
     async def _handle_msg(self):
         try:
             while self.isconnected():
+                if self._stream is not None:
+                    # Sleep until data arrives, then handle it and anything else ready
+                    got = await self._stream.readinto(self._rmv[self._rlen :])
+                    if got is None:  # Readable but nothing yet, e.g. a partial TLS record
+                        continue
+                    if got == 0:
+                        raise OSError(-1, "Connection closed by host")
+                    self._received(got)
+                    async with self.lock:
+                        await self.wait_msg(got)
+                    continue
                 async with self.lock:
-                    await self.wait_msg()  # Immediate return if no message
+                    busy = await self.wait_msg()  # Immediate return if no message
                 # https://github.com/peterhinch/micropython-mqtt/issues/166
-                # A delay > 0 is necessary for webrepl compatibility.
-                await asyncio.sleep_ms(5)  # Let other tasks get lock
+                # A delay > 0 is necessary for webrepl compatibility. While
+                # data is arriving just yield so the next batch is not delayed.
+                await asyncio.sleep_ms(0 if busy else 5)  # Let other tasks get lock
 
         except OSError:
             pass
@@ -878,6 +1282,8 @@ class MQTTClient(MQTT_base):
     def _reconnect(self):  # Schedule a reconnection if not underway.
         if self._isconnected:
             self._isconnected = False
+            self.reconnects += 1
+            self.down_at = ticks_ms()
             asyncio.create_task(self._kill_tasks(True))  # Shut down tasks and socket
             if self._events:  # Signal an outage
                 self.down.set()
@@ -892,20 +1298,24 @@ class MQTTClient(MQTT_base):
     # Scheduled on 1st successful connection. Runs forever maintaining wifi and
     # broker connection. Must handle conditions at edge of WiFi range.
     async def _keep_connected(self):
+        retry = False  # Fast resume is only tried once per outage
         while self._has_connected:
             if self.isconnected():  # Pause for 1 second
                 await asyncio.sleep(1)
-                gc.collect()
+                self._gc_collect()
             else:  # Link is down, socket is closed, tasks are killed
-                try:
-                    self._sta_if.disconnect()
-                except OSError:
-                    self.dprint("Wi-Fi not started, unable to disconnect interface")
-                await asyncio.sleep(1)
-                try:
-                    await self.wifi_connect()
-                except OSError:
-                    continue
+                t = ticks_ms()
+                if not (self._fast_resume and not retry and self._sta_if.isconnected()):
+                    try:
+                        self._sta_if.disconnect()
+                    except OSError:
+                        self.dprint("Wi-Fi not started, unable to disconnect interface")
+                    await asyncio.sleep(1)
+                    try:
+                        await self.wifi_connect(self._fast_resume)
+                    except OSError:
+                        continue
+                self.wifi_ms = ticks_diff(ticks_ms(), t)
                 if not self._has_connected:  # User has issued the terminal .disconnect()
                     self.dprint("Disconnected, exiting _keep_connected")
                     break
@@ -913,12 +1323,14 @@ class MQTTClient(MQTT_base):
                     await self.connect()
                     # Now has set ._isconnected and scheduled _connect_handler().
                     self.dprint("Reconnect OK!")
+                    retry = False
                 except OSError as e:
                     self.dprint("Error in reconnect. %s", e)
                     # Can get ECONNABORTED or -1. The latter signifies no or bad CONNACK received.
                     self._close()  # Disconnect and try again.
                     self._in_connect = False
                     self._isconnected = False
+                    retry = True
         self.dprint("Disconnected, exited _keep_connected")
 
     async def subscribe(self, topic, qos=0, properties=None):
@@ -931,6 +1343,17 @@ class MQTTClient(MQTT_base):
                 pass
             self._reconnect()  # Broker or WiFi fail.
 
+    async def subscribe_many(self, topics, properties=None):
+        for _, qos in topics:
+            qos_check(qos)
+        while 1:
+            await self._connection()
+            try:
+                return await super().subscribe_many(topics, properties)
+            except OSError:
+                pass
+            self._reconnect()  # Broker or WiFi fail.
+
     async def unsubscribe(self, topic, properties=None):
         while 1:
             await self._connection()
@@ -0,0 +1,215 @@
+# mqtt_v5_properties.py MQTT v5 property encoding and decoding for mqtt_as.
+# encode_properties() and decode_properties() convert between dicts of
+# {identifier: value} and the wire format. scan_properties() walks encoded
+# properties in place, driven by a lookup table of property types, and only
+# returns the one integer property it is asked for, so the receive path can
+# read e.g. a topic alias without allocating.
+
+import struct
+
+# Property types (MQTT v5 section 2.2.2.2)
+BYTE = 0
+TWO_BYTE_INT = 1
+FOUR_BYTE_INT = 2
+UTF8_ENCODED_STRING = 3
+BINARY_DATA = 4
+VARIABLE_BYTE_INT = 5
+UTF8_STRING_PAIR = 6
+
+# identifier: type
+PROPERTY_TYPES = {
+    0x01: BYTE,  # Payload Format Indicator
+    0x02: FOUR_BYTE_INT,  # Message Expiry Interval
+    0x03: UTF8_ENCODED_STRING,  # Content Type
+    0x08: UTF8_ENCODED_STRING,  # Response Topic
+    0x09: BINARY_DATA,  # Correlation Data
+    0x0B: VARIABLE_BYTE_INT,  # Subscription Identifier
+    0x11: FOUR_BYTE_INT,  # Session Expiry Interval
+    0x12: UTF8_ENCODED_STRING,  # Assigned Client Identifier
+    0x13: TWO_BYTE_INT,  # Server Keep Alive
+    0x15: UTF8_ENCODED_STRING,  # Authentication Method
+    0x16: BINARY_DATA,  # Authentication Data
+    0x17: BYTE,  # Request Problem Information
+    0x18: FOUR_BYTE_INT,  # Will Delay Interval
+    0x19: BYTE,  # Request Response Information
+    0x1A: UTF8_ENCODED_STRING,  # Response Information
+    0x1C: UTF8_ENCODED_STRING,  # Server Reference
+    0x1F: UTF8_ENCODED_STRING,  # Reason String
+    0x21: TWO_BYTE_INT,  # Receive Maximum
+    0x22: TWO_BYTE_INT,  # Topic Alias Maximum
+    0x23: TWO_BYTE_INT,  # Topic Alias
+    0x24: BYTE,  # Maximum QoS
+    0x25: BYTE,  # Retain Available
+    0x26: UTF8_STRING_PAIR,  # User Property
+    0x27: FOUR_BYTE_INT,  # Maximum Packet Size
+    0x28: BYTE,  # Wildcard Subscription Available
+    0x29: BYTE,  # Subscription Identifier Available
+    0x2A: BYTE,  # Shared Subscription Available
+}
+
+# Properties that may appear more than once: decoded as a list of values
+_REPEATABLE = (0x0B, 0x26)
+
+# Type of each identifier, indexed by identifier; 0xFF for unknown ones
+_TYPES = bytearray(b"\xff" * 0x2B)
+for _ident, _type in PROPERTY_TYPES.items():
+    _TYPES[_ident] = _type
+del _ident, _type
+
+# Size in bytes of the fixed size types, indexed by type; 0 if variable
+_SIZES = bytes((1, 2, 4, 0, 0, 0, 0))
+
+
+def _type(ident):
+    return _TYPES[ident] if ident < len(_TYPES) else 0xFF
+
+
+# Received properties that cannot be decoded. Raised as OSError so that the
+# client treats it like any other broken connection and reconnects.
+def _malformed(reason):
+    raise OSError(-1, "Malformed properties: " + reason)
+
+
+def _check(offs, end):
+    if offs > end:
+        _malformed("truncated")
+
+
+def _encode_vbi(x):
+    out = bytearray()
+    while True:
+        b = x & 0x7F
+        x >>= 7
+        if x:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return out
+
+
+def _decode_vbi(buf, offs):
+    x = 0
+    shift = 0
+    while True:
+        b = buf[offs]
+        offs += 1
+        x |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return x, offs
+        shift += 7
+
+
+def _encode_str(s):
+    if isinstance(s, str):
+        s = s.encode()
+    return struct.pack("!H", len(s)) + s
+
+
+def _encode_value(t, value):
+    if t == BYTE:
+        return bytes((value,))
+    if t == TWO_BYTE_INT:
+        return struct.pack("!H", value)
+    if t == FOUR_BYTE_INT:
+        return struct.pack("!I", value)
+    if t == VARIABLE_BYTE_INT:
+        return _encode_vbi(value)
+    if t == UTF8_STRING_PAIR:
+        return _encode_str(value[0]) + _encode_str(value[1])
+    return _encode_str(value)  # UTF-8 string or binary data
+
+
+# Encode {identifier: value} as properties: their length as a variable byte
+# integer, then the properties. None or {} encodes as b"\x00". Repeatable
+# properties may be given a list of values.
+def encode_properties(properties):
+    if not properties:
+        return b"\x00"
+    out = bytearray()
+    for ident, value in properties.items():
+        t = _type(ident)
+        if t == 0xFF:
+            raise ValueError("Unknown property 0x%x" % ident)
+        values = value if ident in _REPEATABLE and isinstance(value, list) else (value,)
+        for value in values:
+            out.append(ident)
+            out.extend(_encode_value(t, value))
+    return bytes(_encode_vbi(len(out)) + out)
+
+
+# Decode properties_length bytes of properties (without their length prefix)
+# into {identifier: value}. Strings are returned as str, binary data as bytes.
+def decode_properties(props, properties_length):
+    decoded = {}
+    offs = 0
+    try:
+        while offs < properties_length:
+            ident = props[offs]
+            offs += 1
+            t = _type(ident)
+            if t == 0xFF:
+                _malformed("unknown property 0x%x" % ident)
+            size = _SIZES[t]
+            if size:
+                value = int.from_bytes(props[offs : offs + size], "big")
+                offs += size
+            elif t == VARIABLE_BYTE_INT:
+                value, offs = _decode_vbi(props, offs)
+            else:
+                n = props[offs] << 8 | props[offs + 1]
+                value = bytes(props[offs + 2 : offs + 2 + n])
+                offs += 2 + n
+                if t == UTF8_STRING_PAIR:
+                    n2 = props[offs] << 8 | props[offs + 1]
+                    value = (value.decode(), bytes(props[offs + 2 : offs + 2 + n2]).decode())
+                    offs += 2 + n2
+                elif t == UTF8_ENCODED_STRING:
+                    value = value.decode()
+            if ident in _REPEATABLE:
+                decoded.setdefault(ident, []).append(value)
+            else:
+                decoded[ident] = value
+    except (IndexError, ValueError):  # Truncated, or not UTF-8
+        _malformed("truncated or invalid")
+    _check(offs, properties_length)
+    return decoded
+
+
+# Walk the properties in buf[offs:end] in place. Returns (value, others): the
+# value of integer property ident (default if absent) and the number of other
+# properties, which are skipped without being decoded.
+def scan_properties(buf, offs, end, ident, default=0):
+    value = default
+    others = 0
+    while offs < end:
+        pid = buf[offs]
+        offs += 1
+        t = _type(pid)
+        if t == 0xFF:
+            _malformed("unknown property 0x%x" % pid)
+        size = _SIZES[t]
+        if size:
+            _check(offs + size, end)
+            if pid == ident:
+                value = buf[offs]
+                for i in range(offs + 1, offs + size):
+                    value = value << 8 | buf[i]
+            else:
+                others += 1
+            offs += size
+            continue
+        others += 1
+        if t == VARIABLE_BYTE_INT:
+            while True:
+                _check(offs + 1, end)
+                offs += 1
+                if not buf[offs - 1] & 0x80:
+                    break
+        else:
+            _check(offs + 2, end)
+            offs += 2 + (buf[offs] << 8 | buf[offs + 1])
+            if t == UTF8_STRING_PAIR:
+                _check(offs + 2, end)
+                offs += 2 + (buf[offs] << 8 | buf[offs + 1])
+            _check(offs, end)
+    return value, others
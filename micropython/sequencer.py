@@ -0,0 +1,139 @@
+# sequencer.py Non-blocking notification melodies for the Galactic Unicorn.
+# A single scheduler task plays compiled melody descriptors. Asking for a
+# melody while one is playing pre-empts it at the next step, or merges with it
+# if it is the same melody, so a burst of messages never stacks up sounds.
+
+import math
+import time
+import urandom
+from array import array
+import uasyncio as asyncio
+
+STEP_MS = 10  # Envelope resolution while a note sustains
+FADE_STEPS = 10
+FADE_STEP_MS = 5
+JITTER_MS = 2  # Random +/- spread on each sustain step, for a less mechanical sound
+MIN_SLEEP_MS = 4  # Every step yields at least this long so rendering never starves
+
+# Envelope ids
+ENV_FLAT = 0  # Steady pitch and volume, then fade out
+ENV_REALISTIC = 1  # 5 Hz +/-5 Hz vibrato and 3 Hz 80-100% tremolo, then fade out
+
+# name -> (notes as (frequency Hz, duration ms) pairs, envelope id, gap after each note ms)
+MELODIES = {
+    "chime": (((523.25, 200), (311.13, 200), (392, 200), (466.16, 200)), ENV_REALISTIC, 10),
+    "triad": (((440, 200), (550, 200), (660, 200)), ENV_REALISTIC, 50),  # A major triad: A4, C#5, E5
+    "beep": (((880, 120),), ENV_FLAT, 10),
+}
+DEFAULT_MELODY = "chime"
+SILENT = ("", "none", "off", "silent", "mute")
+
+# (frequency, duration, envelope) -> (start times in ms, frequencies, levels 0-255)
+_note_tables = {}
+
+
+# Precompute a note's envelope so playing it is just walking the tables.
+def note_table(base_freq, duration_ms, envelope):
+    key = (base_freq, duration_ms, envelope)
+    table = _note_tables.get(key)
+    if table is not None:
+        return table
+
+    times = array("H")
+    freqs = array("H")
+    levels = array("B")
+    realistic = envelope == ENV_REALISTIC
+    t = 0
+    tremolo = 1.0
+    while t < duration_ms - FADE_STEPS * FADE_STEP_MS:
+        times.append(t)
+        if realistic:
+            tremolo = 0.8 + 0.2 * math.sin(2 * math.pi * 3 * t / 1000)
+            freqs.append(int(base_freq + 5 * math.sin(2 * math.pi * 5 * t / 1000)))
+            t += STEP_MS + urandom.getrandbits(8) % (2 * JITTER_MS + 1) - JITTER_MS
+        else:
+            freqs.append(int(base_freq))
+            t += STEP_MS
+        levels.append(int(255 * tremolo))
+
+    # Fade-out volume smoothly
+    if realistic:
+        tremolo = 0.8 + 0.2 * math.sin(2 * math.pi * 3 * t / 1000)
+    freq = freqs[-1] if freqs else int(base_freq)
+    for i in range(FADE_STEPS, 0, -1):
+        times.append(t)
+        freqs.append(freq)
+        levels.append(int(255 * tremolo * i / FADE_STEPS))
+        t += FADE_STEP_MS
+    times.append(t)  # end of the note
+
+    table = _note_tables[key] = (times, freqs, levels)
+    return table
+
+
+class Sequencer:
+    def __init__(self, gu, channel=0):
+        self._gu = gu
+        self._channel = gu.synth_channel(channel)
+        self._evt = asyncio.Event()
+        self._pending = None  # Melody requested but not started
+        self.playing = None  # Melody being played
+        self.volume = 1.0
+
+    # Request a melody by name; unknown names play DEFAULT_MELODY and the
+    # SILENT names stop whatever is playing.
+    def play(self, name=DEFAULT_MELODY):
+        name = str(name).lower()
+        if name in SILENT:
+            self.stop()
+            return
+        if name not in MELODIES:
+            name = DEFAULT_MELODY
+        if name == self.playing and self._pending is None:
+            return  # Same melody already sounding: merge
+        self._pending = name
+        self._evt.set()
+
+    def stop(self):
+        if self.playing is not None or self._pending is not None:
+            self._pending = ""  # Pre-empt with silence
+            self._evt.set()
+
+    # The scheduler task: run once for the life of the application.
+    async def run(self):
+        while True:
+            await self._evt.wait()
+            self._evt.clear()
+            while self._pending is not None:
+                name = self._pending
+                self._pending = None
+                if name:
+                    await self._play(name)
+
+    async def _play(self, name):
+        notes, envelope, gap_ms = MELODIES[name]
+        channel = self._channel
+        self.playing = name
+        try:
+            for freq, duration_ms in notes:
+                times, freqs, levels = note_table(freq, duration_ms, envelope)
+                last = len(freqs) - 1
+                start = time.ticks_ms()
+                i = 0
+                self._gu.play_synth()
+                while i <= last:
+                    if self._pending is not None:
+                        return  # Pre-empted by another request
+                    channel.play_tone(freqs[i], self.volume * levels[i] / 255)
+                    wait = time.ticks_diff(time.ticks_add(start, times[i + 1]), time.ticks_ms())
+                    await asyncio.sleep_ms(max(wait, MIN_SLEEP_MS))
+                    # running late: skip the steps whose time is already over
+                    elapsed = time.ticks_diff(time.ticks_ms(), start)
+                    i += 1
+                    while i <= last and times[i + 1] <= elapsed:
+                        i += 1
+                self._gu.stop_playing()
+                await asyncio.sleep_ms(gap_ms)
+        finally:
+            self._gu.stop_playing()
+            self.playing = None
@@ -0,0 +1,75 @@
+# telemetry.py Performance figures for the Galactic Unicorn scroller, collected
+# as it runs and reported as a compact JSON status document. Timings are kept
+# in fixed-size sample windows that are emptied by each report, so every
+# report covers the interval since the one before.
+
+import gc
+import json
+import time
+from array import array
+
+FRAME_SAMPLES = 128  # Most recent frame times kept per interval
+LATENCY_SAMPLES = 16
+
+
+# A window of the most recent readings, overwriting the oldest once full.
+class Samples:
+    def __init__(self, size):
+        self._values = array("I", [0] * size)
+        self._next = 0
+        self.count = 0  # Readings since the last clear(), including overwritten ones
+
+    def add(self, value):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._values)
+        self.count += 1
+
+    # The given percentiles of the readings held, or None if there are none.
+    def percentiles(self, *pcts):
+        n = min(self.count, len(self._values))
+        if not n:
+            return None
+        values = sorted(self._values[:n])
+        return [values[min(n - 1, n * pct // 100)] for pct in pcts]
+
+    def clear(self):
+        self._next = 0
+        self.count = 0
+
+
+class Telemetry:
+    def __init__(self):
+        self.frame_us = Samples(FRAME_SAMPLES)  # Time to draw and show a scroll frame
+        self.latency_ms = Samples(LATENCY_SAMPLES)  # Message received to its first frame shown
+        self.gc_max_pause_us = 0  # Longest collect() this interval
+        self.resume_ms = None  # Outage start to the first message after it
+        self._start = time.time()
+
+    # A timed garbage collection, so the worst pause can be reported. Used for
+    # every periodic collection, including the MQTT client's.
+    def collect(self):
+        t = time.ticks_us()
+        gc.collect()
+        pause = time.ticks_diff(time.ticks_us(), t)
+        if pause > self.gc_max_pause_us:
+            self.gc_max_pause_us = pause
+
+    # The status document as a JSON string: the figures collected here plus
+    # the counters passed in, such as {"dropped": 3}. Starts a new interval.
+    def status(self, **counters):
+        self.collect()
+        doc = {
+            "uptime_s": int(time.time() - self._start),
+            "frames": self.frame_us.count,
+            "frame_us": self.frame_us.percentiles(50, 99),
+            "latency_ms": self.latency_ms.percentiles(50, 99),
+            "mem_free": gc.mem_free(),
+            "mem_alloc": gc.mem_alloc(),
+            "gc_max_pause_us": self.gc_max_pause_us,
+            "resume_ms": self.resume_ms,
+        }
+        doc.update(counters)
+        self.frame_us.clear()
+        self.latency_ms.clear()
+        self.gc_max_pause_us = 0
+        return json.dumps(doc)
@@ -0,0 +1,158 @@
+# bench.py Micro-benchmarks for the payload and rendering hot paths in main.py.
+# Runs under CPython with the stand-ins in util/host (NumPy is needed for the
+# display). Results can be saved as JSON and compared with an earlier run.
+#
+# Usage examples:
+#   python util/bench.py --out before.json
+#   python util/bench.py --compare before.json
+#   python util/bench.py --only parse_msg,scroll_frame -n 5000
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "host"))
+import hostenv  # noqa: E402
+
+hostenv.install()
+import main  # noqa: E402
+
+# Same shape of payload as util/galactic.sh sends
+PAYLOAD = json.dumps(
+    {
+        "msg": "10/17/26 12:00:00 This is a test message. Have a great day 42",
+        "outline_colour": "black_or_brown",
+        "msg_colour": "any_except_black_or_brown",
+        "bg_colour": "random",
+    }
+)
+MESSAGE = "                " + "This is a test message. Have a great day 42" + "             "
+
+
+def _scroll_frame(use_strip):
+    viewport = main.TextViewport(MESSAGE)
+    strip = main.MessageStrip(viewport, 2) if use_strip else None
+    bg = main.pens.rgb((0, 0, 0))
+    outline = main.pens.rgb((0, 0, 255))
+    text = main.pens.rgb((255, 255, 255))
+    span = viewport.width - main.WIDTH
+    state = [0]
+
+    def frame():
+        state[0] = (state[0] + 1) % span
+        main.draw_scroll_frame(strip, viewport, state[0], bg, outline, text)
+
+    return frame
+
+
+def _outline_msg():
+    outline = main.pens.rgb((0, 0, 0))
+    text = main.pens.rgb((255, 255, 255))
+    return lambda: main.outline_msg(MESSAGE, outline, text, main.PADDING, 2)
+
+
+# name -> factory returning the zero-argument callable to time
+CASES = {
+    "parse_msg": lambda: lambda: main.parse_msg(PAYLOAD),
+    "parse_msg_plain": lambda: lambda: main.parse_msg("not json at all"),
+    "parse_rgb_triple": lambda: lambda: main.parse_rgb("(255, 0x80, 0)"),
+    "parse_rgb_words": lambda: lambda: main.parse_rgb("any_except_black_or_brown"),
+    "pick_colour": lambda: lambda: main.pick_colour("any_except_black_or_brown"),
+    "simple_split": lambda: lambda: main.simple_split("any_except_black_or_brown"),
+    "outline_msg": _outline_msg,
+    "scroll_frame": lambda: _scroll_frame(True),
+    "scroll_frame_viewport": lambda: _scroll_frame(False),
+    "scroll_scene": lambda: lambda: main.scroll_scene(PAYLOAD),
+}
+
+
+def _percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def run_case(fn, iterations, warmup):
+    for _ in range(warmup):
+        fn()
+
+    # latency: one timing per call
+    clock = time.perf_counter_ns
+    samples = []
+    start = clock()
+    for _ in range(iterations):
+        t = clock()
+        fn()
+        samples.append(clock() - t)
+    total = clock() - start
+    samples.sort()
+
+    # allocations: heap high-water above the starting point, per call
+    alloc_calls = min(iterations, 200)
+    peak_sum = 0
+    tracemalloc.start()
+    for _ in range(alloc_calls):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        peak_sum += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    return {
+        "ops_per_sec": round(iterations / (total / 1e9), 1),
+        "p50_us": round(_percentile(samples, 50) / 1000, 2),
+        "p99_us": round(_percentile(samples, 99) / 1000, 2),
+        "alloc_bytes": round(peak_sum / alloc_calls, 1),
+    }
+
+
+def compare(base, results):
+    print("\n%-24s %14s %14s %14s" % ("vs baseline", "ops/sec", "p99", "alloc"))
+    for name, r in results.items():
+        b = base.get("results", {}).get(name)
+        if b is None:
+            continue
+
+        def delta(key):
+            return "%+.1f%%" % ((r[key] - b[key]) * 100 / b[key]) if b[key] else "n/a"
+
+        print("%-24s %14s %14s %14s" % (name, delta("ops_per_sec"), delta("p99_us"), delta("alloc_bytes")))
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Benchmark main.py hot paths")
+    parser.add_argument("-n", "--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--only", help="comma separated case names")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier run")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(CASES)
+    results = {}
+    print("%-24s %12s %10s %10s %12s" % ("case", "ops/sec", "p50 us", "p99 us", "alloc B"))
+    for name in names:
+        r = results[name] = run_case(CASES[name](), args.iterations, args.warmup)
+        print("%-24s %12.1f %10.2f %10.2f %12.1f" % (name, r["ops_per_sec"], r["p50_us"], r["p99_us"], r["alloc_bytes"]))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as fp:
+            json.dump(report, fp, indent=2)
+    if args.compare:
+        with open(args.compare) as fp:
+            compare(json.load(fp), results)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,131 @@
+# galactic.py Host (CPython) stand-in for the Pimoroni galactic module.
+# update() snapshots the PicoGraphics framebuffer so frames can be counted,
+# timed and dumped as PPM images; the synth and switches are inert stubs.
+#
+# Frames are written to $GU_DUMP_DIR when it is set, or call dump_frames(path).
+
+import os
+import time
+
+import numpy as np
+
+
+class SynthChannel:
+    def __init__(self):
+        self.tones = 0  # play_tone() calls, handy for spotting audio hot loops
+        self.freq = 0
+        self.vol = 0.0
+
+    def play_tone(self, frequency, volume=None, attack=None, release=None):
+        self.tones += 1
+        self.freq = frequency
+        if volume is not None:
+            self.vol = volume
+
+    def configure(self, **kwargs):
+        pass
+
+    def frequency(self, freq=None):
+        if freq is None:
+            return self.freq
+        self.freq = freq
+
+    def volume(self, vol=None):
+        if vol is None:
+            return self.vol
+        self.vol = vol
+
+    def trigger_attack(self):
+        pass
+
+    def trigger_release(self):
+        pass
+
+
+class GalacticUnicorn:
+    WIDTH = 53
+    HEIGHT = 11
+
+    SWITCH_A = 0
+    SWITCH_B = 1
+    SWITCH_C = 3
+    SWITCH_D = 6
+    SWITCH_SLEEP = 27
+    SWITCH_VOLUME_UP = 7
+    SWITCH_VOLUME_DOWN = 8
+    SWITCH_BRIGHTNESS_UP = 21
+    SWITCH_BRIGHTNESS_DOWN = 26
+
+    def __init__(self):
+        self.frame = np.zeros((self.HEIGHT, self.WIDTH), dtype="<u4")
+        self.frames = 0  # update() calls
+        self.update_times = []  # time.perf_counter() of each update()
+        self.pressed = set()  # switches reported as held by is_pressed()
+        self.playing = False
+        self._brightness = 0.5
+        self._volume = 0.5
+        self._channels = [SynthChannel() for _ in range(8)]
+        self._dump_dir = os.environ.get("GU_DUMP_DIR")
+
+    def clear(self):
+        self.frame[:] = 0
+
+    def update(self, graphics):
+        self.frame[:] = graphics.pixels
+        self.frames += 1
+        self.update_times.append(time.perf_counter())
+        if self._dump_dir:
+            self.dump(os.path.join(self._dump_dir, "frame_%06d.ppm" % self.frames))
+
+    def dump_frames(self, path):
+        os.makedirs(path, exist_ok=True)
+        self._dump_dir = path
+
+    # Write the last frame as a binary PPM, scaled up so it is viewable.
+    def dump(self, path, scale=8):
+        f = self.frame
+        rgb = np.stack(((f >> 16) & 0xFF, (f >> 8) & 0xFF, f & 0xFF), axis=-1).astype(np.uint8)
+        rgb = rgb.repeat(scale, 0).repeat(scale, 1)
+        with open(path, "wb") as fp:
+            fp.write(b"P6 %d %d 255\n" % (rgb.shape[1], rgb.shape[0]))
+            fp.write(rgb.tobytes())
+
+    # The last frame as text: '#' for lit pixels, '.' for dark ones.
+    def ascii(self):
+        return "\n".join("".join("#" if p else "." for p in row) for row in self.frame)
+
+    def set_brightness(self, value):
+        self._brightness = min(max(value, 0.0), 1.0)
+
+    def get_brightness(self):
+        return self._brightness
+
+    def adjust_brightness(self, delta):
+        self.set_brightness(self._brightness + delta)
+
+    def set_volume(self, value):
+        self._volume = min(max(value, 0.0), 1.0)
+
+    def get_volume(self):
+        return self._volume
+
+    def adjust_volume(self, delta):
+        self.set_volume(self._volume + delta)
+
+    def light(self):
+        return 0
+
+    def is_pressed(self, switch):
+        return switch in self.pressed
+
+    def synth_channel(self, channel):
+        return self._channels[channel]
+
+    def play_synth(self):
+        self.playing = True
+
+    def play_sample(self, data):
+        self.playing = True
+
+    def stop_playing(self):
+        self.playing = False
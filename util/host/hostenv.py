@@ -0,0 +1,40 @@
+# hostenv.py Prepare CPython to run the MicroPython sources in micropython/.
+# install() puts the stand-ins in this directory and the firmware sources on
+# sys.path and adds MicroPython's ticks functions to the time module.
+
+import os
+import sys
+import time
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+FIRMWARE_DIR = os.path.join(os.path.dirname(os.path.dirname(HOST_DIR)), "micropython")
+
+_TICKS_PERIOD = 1 << 30
+
+
+def _ticks_ms():
+    return int(time.monotonic() * 1000) & (_TICKS_PERIOD - 1)
+
+
+def _ticks_us():
+    return int(time.monotonic() * 1000000) & (_TICKS_PERIOD - 1)
+
+
+def _ticks_add(ticks, delta):
+    return (ticks + delta) & (_TICKS_PERIOD - 1)
+
+
+def _ticks_diff(end, start):
+    return ((end - start + _TICKS_PERIOD // 2) & (_TICKS_PERIOD - 1)) - _TICKS_PERIOD // 2
+
+
+def install():
+    for path in (FIRMWARE_DIR, HOST_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    time.ticks_ms = _ticks_ms
+    time.ticks_us = _ticks_us
+    time.ticks_add = _ticks_add
+    time.ticks_diff = _ticks_diff
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    time.sleep_us = lambda us: time.sleep(us / 1000000)
@@ -0,0 +1,13 @@
+# micropython.py Host (CPython) stub of the MicroPython micropython module.
+
+
+def const(expr):
+    return expr
+
+
+def mem_info(verbose=False):
+    pass
+
+
+def opt_level(level=None):
+    return 0
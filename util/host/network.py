@@ -0,0 +1,40 @@
+# network.py Host (CPython) stub of the MicroPython network module. The
+# interface reports itself connected so mqtt_as can reach a broker on the LAN.
+
+STA_IF = 0
+AP_IF = 1
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_GOT_IP = 3
+
+
+class WLAN:
+    PM_NONE = 0
+
+    def __init__(self, interface=STA_IF):
+        self._active = False
+
+    def active(self, state=None):
+        if state is None:
+            return self._active
+        self._active = state
+
+    def connect(self, ssid=None, key=None, **kwargs):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def isconnected(self):
+        return True
+
+    def status(self, param=None):
+        if param == "rssi":
+            return -50
+        return STAT_GOT_IP
+
+    def config(self, *args, **kwargs):
+        pass
+
+    def ifconfig(self):
+        return ("127.0.0.1", "255.0.0.0", "127.0.0.1", "127.0.0.1")
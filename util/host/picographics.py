@@ -0,0 +1,169 @@
+# picographics.py Host (CPython) stand-in for the Pimoroni picographics module.
+# Keeps a NumPy backed RGB888 framebuffer the size of the Galactic Unicorn so the
+# rendering code in micropython/main.py can be run and profiled off-device.
+# Put util/host on sys.path ahead of micropython/ to use it.
+#
+# Like the real module the object exposes its framebuffer through the buffer
+# protocol: memoryview(graphics) is 4 bytes per pixel, row-major.
+
+import colorsys
+
+import numpy as np
+
+DISPLAY_GALACTIC_UNICORN = 13
+PEN_RGB888 = 7
+
+# 5x7 glyphs for ASCII 0x20-0x7E, one byte per column, bit 0 is the top row.
+# Glyphs are trimmed to their inked columns so metrics follow bitmap8's
+# proportional widths; letter spacing is added by text() and measure_text().
+_GLYPHS = (
+    "00 00 00", "5f", "07 00 07", "14 7f 14 7f 14", "24 2a 7f 2a 12",
+    "23 13 08 64 62", "36 49 56 20 50", "07", "1c 22 41", "41 22 1c",
+    "2a 1c 7f 1c 2a", "08 08 3e 08 08", "50 30", "08 08 08 08", "60 60",
+    "20 10 08 04 02", "3e 51 49 45 3e", "42 7f 40", "42 61 51 49 46",
+    "21 41 45 4b 31", "18 14 12 7f 10", "27 45 45 45 39", "3c 4a 49 49 30",
+    "01 71 09 05 03", "36 49 49 49 36", "06 49 49 29 1e", "36 36", "56 36",
+    "08 14 22 41", "14 14 14 14 14", "41 22 14 08", "02 01 51 09 06",
+    "32 49 79 41 3e", "7e 11 11 11 7e", "7f 49 49 49 36", "3e 41 41 41 22",
+    "7f 41 41 22 1c", "7f 49 49 49 41", "7f 09 09 09 01", "3e 41 49 49 7a",
+    "7f 08 08 08 7f", "41 7f 41", "20 40 41 3f 01", "7f 08 14 22 41",
+    "7f 40 40 40 40", "7f 02 0c 02 7f", "7f 04 08 10 7f", "3e 41 41 41 3e",
+    "7f 09 09 09 06", "3e 41 51 21 5e", "7f 09 19 29 46", "46 49 49 49 31",
+    "01 01 7f 01 01", "3f 40 40 40 3f", "1f 20 40 20 1f", "3f 40 38 40 3f",
+    "63 14 08 14 63", "07 08 70 08 07", "61 51 49 45 43", "7f 41 41",
+    "02 04 08 10 20", "41 41 7f", "04 02 01 02 04", "40 40 40 40 40", "01 02",
+    "20 54 54 54 78", "7f 48 44 44 38", "38 44 44 44 20", "38 44 44 48 7f",
+    "38 54 54 54 18", "08 7e 09 01 02", "0c 52 52 52 3e", "7f 08 04 04 78",
+    "44 7d 40", "20 40 44 3d", "7f 10 28 44", "41 7f 40", "7c 04 18 04 78",
+    "7c 08 04 04 78", "38 44 44 44 38", "7c 14 14 14 08", "08 14 14 18 7c",
+    "7c 08 04 04 08", "48 54 54 54 20", "04 3f 44 40 20", "3c 40 40 20 7c",
+    "1c 20 40 20 1c", "3c 40 30 40 3c", "44 28 10 28 44", "0c 50 50 50 3c",
+    "44 64 54 4c 44", "08 36 41", "7f", "41 36 08", "08 04 08 10 08",
+)
+_FONT_HEIGHT = 8
+
+
+def _glyph_mask(columns):
+    mask = np.zeros((_FONT_HEIGHT, len(columns)), dtype=bool)
+    for x, col in enumerate(columns):
+        for y in range(_FONT_HEIGHT):
+            mask[y, x] = bool(col >> y & 1)
+    return mask
+
+
+_MASKS = {chr(0x20 + i): _glyph_mask([int(c, 16) for c in g.split()]) for i, g in enumerate(_GLYPHS)}
+_UNKNOWN = _MASKS["?"]
+
+
+class PicoGraphics(bytearray):
+    def __init__(self, display=DISPLAY_GALACTIC_UNICORN, pen_type=PEN_RGB888, width=53, height=11):
+        super().__init__(width * height * 4)
+        self.width = width
+        self.height = height
+        self.pixels = np.frombuffer(self, dtype="<u4").reshape(height, width)
+        self._pen = 0
+        self._font = "bitmap8"
+        self._clip = (0, 0, width, height)
+
+    # Pens are packed 0xRRGGBB values, as on the RGB888 device framebuffer.
+    def create_pen(self, r, g, b):
+        return (int(r) & 0xFF) << 16 | (int(g) & 0xFF) << 8 | (int(b) & 0xFF)
+
+    def create_pen_hsv(self, h, s, v):
+        r, g, b = colorsys.hsv_to_rgb(h % 1.0, s, v)
+        return self.create_pen(r * 255, g * 255, b * 255)
+
+    def set_pen(self, pen):
+        self._pen = pen
+
+    def set_font(self, font):
+        self._font = font
+
+    def get_bounds(self):
+        return self.width, self.height
+
+    def set_clip(self, x, y, w, h):
+        self._clip = (max(x, 0), max(y, 0), min(x + w, self.width), min(y + h, self.height))
+
+    def remove_clip(self):
+        self._clip = (0, 0, self.width, self.height)
+
+    def clear(self):
+        x0, y0, x1, y1 = self._clip
+        self.pixels[y0:y1, x0:x1] = self._pen
+
+    def pixel(self, x, y):
+        x0, y0, x1, y1 = self._clip
+        if x0 <= x < x1 and y0 <= y < y1:
+            self.pixels[y, x] = self._pen
+
+    def pixel_span(self, x, y, length):
+        self.rectangle(x, y, length, 1)
+
+    def rectangle(self, x, y, w, h):
+        x0, y0, x1, y1 = self._clip
+        xa, xb = max(x, x0), min(x + w, x1)
+        ya, yb = max(y, y0), min(y + h, y1)
+        if xa < xb and ya < yb:
+            self.pixels[ya:yb, xa:xb] = self._pen
+
+    def line(self, x1, y1, x2, y2, thickness=1):
+        dx, dy = abs(x2 - x1), -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        while True:
+            if thickness > 1:
+                self.rectangle(x1 - thickness // 2, y1 - thickness // 2, thickness, thickness)
+            else:
+                self.pixel(x1, y1)
+            if x1 == x2 and y1 == y2:
+                return
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    def circle(self, x, y, r):
+        ys, xs = np.ogrid[: self.height, : self.width]
+        inside = (xs - x) ** 2 + (ys - y) ** 2 <= r * r
+        x0, y0, x1, y1 = self._clip
+        clip = np.zeros_like(inside)
+        clip[y0:y1, x0:x1] = True
+        self.pixels[inside & clip] = self._pen
+
+    def measure_text(self, text, scale=1, spacing=1, fixed_width=False):
+        if fixed_width:
+            return len(text) * (6 + spacing) * scale
+        return sum((_MASKS.get(c, _UNKNOWN).shape[1] + spacing) * scale for c in text)
+
+    # Word wrapping and newlines are not emulated: text is laid out on one line.
+    def text(self, text, x, y, wordwrap=-1, scale=1, angle=0, spacing=1, fixed_width=False):
+        x0, y0, x1, y1 = self._clip
+        cursor = 0
+        for c in text:
+            mask = _MASKS.get(c, _UNKNOWN)
+            if scale != 1:
+                mask = mask.repeat(scale, 0).repeat(scale, 1)
+            ys, xs = np.nonzero(mask)
+            xs = xs + cursor
+            if angle == 90:
+                px, py = x - ys, y + xs
+            elif angle == 180:
+                px, py = x - xs, y - ys
+            elif angle == 270:
+                px, py = x + ys, y - xs
+            else:
+                px, py = x + xs, y + ys
+            keep = (px >= x0) & (px < x1) & (py >= y0) & (py < y1)
+            self.pixels[py[keep], px[keep]] = self._pen
+            advance = 6 if fixed_width else mask.shape[1] // scale
+            cursor += (advance + spacing) * scale
+
+    # Host extras: the framebuffer as an (height, width, 3) uint8 RGB array.
+    def rgb(self):
+        p = self.pixels
+        return np.stack(((p >> 16) & 0xFF, (p >> 8) & 0xFF, p & 0xFF), axis=-1).astype(np.uint8)
@@ -0,0 +1,27 @@
+# uasyncio.py Host (CPython) shim of MicroPython's uasyncio: the standard
+# asyncio plus the millisecond helpers MicroPython adds.
+from asyncio import *  # noqa: F401,F403
+import asyncio as _asyncio
+
+
+async def sleep_ms(ms):
+    await _asyncio.sleep(ms / 1000)
+
+
+async def wait_for_ms(aw, timeout):
+    return await _asyncio.wait_for(aw, timeout / 1000)
+
+
+class ThreadSafeFlag:
+    def __init__(self):
+        self._evt = _asyncio.Event()
+
+    def set(self):
+        self._evt.set()
+
+    def clear(self):
+        self._evt.clear()
+
+    async def wait(self):
+        await self._evt.wait()
+        self._evt.clear()
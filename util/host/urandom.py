@@ -0,0 +1,2 @@
+# urandom.py Host (CPython) alias of the MicroPython urandom module.
+from random import getrandbits, randint, random, randrange, seed, choice, uniform  # noqa: F401